@@ -1,91 +1,201 @@
 from flask import Flask
 from flask_cors import CORS
-from flask_migrate import Migrate
-from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import update
 from datetime import datetime
 from config import Config
 from models import db, Donor
+from services.map_tiles import tile_cache
+from services.availability import availability
+from services.dashboard import adjust_counters, read_counters, reconcile_counters
+from services.versions import bump_version
+from utils.fastjson import precompute, precomputed_response
+from utils.compression import init_compression
 import atexit
+import click
+import threading
 
-app = Flask(__name__)
-app.config.from_object(Config)
+_background_lock = threading.Lock()
 
-# Configure SQLAlchemy engine options for MySQL
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = Config.SQLALCHEMY_ENGINE_OPTIONS
 
-# Enable CORS for React frontend
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+def remove_expired_donors(app):
+    """Remove expired donors (mark as unavailable after 14 days)"""
+    with app.app_context():
+        now = datetime.utcnow()
+        # Conditional update: a donor another worker already expired no longer matches
+        stmt = (
+            update(Donor)
+            .where(Donor.auto_remove_date < now, Donor.is_available == True)
+            .values(is_available=False)
+        )
+        if db.session.get_bind().dialect.update_returning:
+            result = db.session.execute(stmt.returning(Donor.district, Donor.blood_group, Donor.geohash))
+            expired = result.all()
+            removed = len(expired)
+        else:
+            # No RETURNING (MySQL): lock the rows the update will change, so a concurrent
+            # run waits and then finds none of them available
+            expired = db.session.query(
+                Donor.district, Donor.blood_group, Donor.geohash
+            ).filter(Donor.auto_remove_date < now, Donor.is_available == True).with_for_update().all()
+            removed = db.session.execute(stmt).rowcount if expired else 0
+        
+        if removed:
+            bump_version('donors')
+            adjust_counters(available_donors=-removed)
+        db.session.commit()
+        
+        for donor in expired:
+            tile_cache.invalidate(donor.geohash)
+            availability.donor_changed((donor.district, donor.blood_group, True), None)
+        print(f"Marked {removed} expired donors as unavailable")
 
-# Initialize database
-db.init_app(app)
-migrate = Migrate(app, db)
 
-# Import routes
-from routes.auth_routes import auth_bp
-from routes.donor_routes import donor_bp
-from routes.request_routes import request_bp
-from routes.notify_routes import notify_bp
-from routes.hospital_routes import hospital_bp
+def reconcile_availability(app):
+    """Resync the in-memory availability counters with the donors table"""
+    with app.app_context():
+        drifted = availability.reconcile()
+        if drifted:
+            print(f"Availability counters corrected for {drifted} district/blood group pairs")
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(donor_bp, url_prefix='/api/donors')
-app.register_blueprint(request_bp, url_prefix='/api/requests')
-app.register_blueprint(notify_bp, url_prefix='/api/notify')
-app.register_blueprint(hospital_bp, url_prefix='/api/hospitals')
 
+def reconcile_dashboard_counters(app):
+    """Recompute the dashboard counters from the donors and requests tables"""
+    with app.app_context():
+        drifted = reconcile_counters()
+        db.session.commit()
+        if drifted:
+            print(f"Dashboard counters corrected: {', '.join(drifted)}")
+
+
+def roll_up_analytics(app):
+    """Fold new request activity into the analytics rollups"""
+    from services.analytics import run_rollups
 
-def remove_expired_donors():
-    """Remove expired donors (mark as unavailable after 14 days)"""
     with app.app_context():
-        expired_donors = Donor.query.filter(
-            Donor.auto_remove_date < datetime.utcnow(),
-            Donor.is_available == True
-        ).all()
-        
-        for donor in expired_donors:
-            donor.is_available = False
-        
+        stats = run_rollups()
         db.session.commit()
-        print(f"Marked {len(expired_donors)} expired donors as unavailable")
+        if stats['created'] or stats['fulfilled']:
+            print(f"Analytics rollups: {stats['created']} created, {stats['fulfilled']} fulfilled requests "
+                  f"in {stats['buckets']} buckets")
 
 
-# Setup scheduler to run every 12 hours
-scheduler = BackgroundScheduler()
-scheduler.add_job(remove_expired_donors, 'interval', hours=12, id='remove_expired_donors')
-scheduler.start()
+def release_stale_outbox_claims(app):
+    """Requeue outbox messages whose worker stopped before recording a result"""
+    from services.outbox import release_stale_claims
 
-# Shut down scheduler when app exits
-atexit.register(lambda: scheduler.shutdown())
+    with app.app_context():
+        released = release_stale_claims()
+        if released:
+            print(f"Released {released} stale outbox claims")
+
+
+def start_background_jobs(app):
+    """Start the maintenance scheduler and the outbox workers (once per app)"""
+    with _background_lock:
+        if 'background_jobs' in app.extensions:
+            return
+
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from services.outbox import start_workers
+
+        # Setup scheduler for periodic maintenance jobs
+        scheduler = BackgroundScheduler()
+        scheduler.add_job(remove_expired_donors, 'interval', hours=12, args=[app],
+                          id='remove_expired_donors')
+        scheduler.add_job(reconcile_availability, 'interval',
+                          minutes=app.config['AVAILABILITY_RECONCILE_MINUTES'], args=[app],
+                          id='reconcile_availability')
+        scheduler.add_job(reconcile_dashboard_counters, 'interval',
+                          minutes=app.config['DASHBOARD_RECONCILE_MINUTES'], args=[app],
+                          id='reconcile_dashboard_counters')
+        scheduler.add_job(roll_up_analytics, 'interval',
+                          minutes=app.config['ANALYTICS_ROLLUP_MINUTES'], args=[app],
+                          id='roll_up_analytics')
+        scheduler.add_job(release_stale_outbox_claims, 'interval', minutes=1, args=[app],
+                          id='release_stale_outbox_claims')
+        scheduler.start()
+
+        # Shut down scheduler when app exits
+        atexit.register(lambda: scheduler.shutdown())
+
+        # Drain the notification outbox in background threads
+        start_workers(app, app.config['OUTBOX_WORKERS'])
+
+        app.extensions['background_jobs'] = scheduler
+
+
+def init_migrate(app):
+    """Register Flask-Migrate; only the `flask db` commands need it"""
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
+def create_app(config_class=Config, start_background=True):
+    """
+    Build the Flask app.
+
+    Background jobs (scheduler, outbox workers) start with the first request
+    when start_background is set, so importing the app, CLI commands and
+    one-off scripts never start them. Flask-Migrate, which pulls in alembic,
+    is only set up when the app is loaded by the `flask` command.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+
+    # Configure SQLAlchemy engine options for MySQL
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = config_class.SQLALCHEMY_ENGINE_OPTIONS
+
+    # Enable CORS for React frontend
+    CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+
+    # gzip large text responses
+    init_compression(app)
+    
+    # Initialize database
+    db.init_app(app)
+    if click.get_current_context(silent=True) is not None:
+        init_migrate(app)
+
+    # Import routes
+    from routes.auth_routes import auth_bp
+    from routes.donor_routes import donor_bp
+    from routes.request_routes import request_bp
+    from routes.notify_routes import notify_bp
+    from routes.hospital_routes import hospital_bp
+    from routes.analytics_routes import analytics_bp
+
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(donor_bp, url_prefix='/api/donors')
+    app.register_blueprint(request_bp, url_prefix='/api/requests')
+    app.register_blueprint(notify_bp, url_prefix='/api/notify')
+    app.register_blueprint(hospital_bp, url_prefix='/api/hospitals')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+
+    app.add_url_rule('/api/health', view_func=health_check, methods=['GET'])
+    app.add_url_rule('/api/dashboard/stats', view_func=dashboard_stats, methods=['GET'])
+
+    if start_background:
+        @app.before_request
+        def ensure_background_jobs():
+            if 'background_jobs' not in app.extensions:
+                start_background_jobs(app)
+
+    return app
 
 
-@app.route('/api/health', methods=['GET'])
 def health_check():
     return {'status': 'ok', 'message': 'BloodLink TN API is running'}
 
 
-@app.route('/api/dashboard/stats', methods=['GET'])
 def dashboard_stats():
-    """Get dashboard statistics"""
-    from models import User, Request
-    
-    total_donors = Donor.query.count()
-    available_donors = Donor.query.filter_by(is_available=True).count()
-    total_requests = Request.query.count()
-    fulfilled_requests = Request.query.filter_by(status='fulfilled').count()
-    
-    return {
-        'total_donors': total_donors,
-        'available_donors': available_donors,
-        'total_requests': total_requests,
-        'fulfilled_requests': fulfilled_requests
-    }
+    """Get dashboard statistics (one read of the materialized counters)"""
+    return precomputed_response(*precompute(read_counters(), compress=False))
 
 
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
     
     app.run(debug=True, host='0.0.0.0', port=5000)
-
-
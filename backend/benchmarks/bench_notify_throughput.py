@@ -0,0 +1,174 @@
+"""
+Benchmark: /api/notify/request-donors throughput and latency against the
+local fake SMS provider.
+
+Seeds one district per fan-out size with that many matching donors in a
+scratch database, starts the fake provider (benchmarks/fake_sms_provider.py)
+and the outbox workers, then posts notify calls and waits for their jobs to
+finish. For each fan-out size it reports the notify call latency (p50/p99),
+delivered and dead-lettered messages, notifications/second from the first
+call to the last delivery, and the p99 of enqueue-to-sent per message.
+
+    python benchmarks/bench_notify_throughput.py
+    python benchmarks/bench_notify_throughput.py --fanout 10 100 1000 --latency-ms 150 --throttle-rate 0.05
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jwt
+
+from config import Config
+from fake_sms_provider import start_fake_provider
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fanout', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--requests', type=int, default=3, help='notify calls per fan-out size')
+    parser.add_argument('--latency-ms', type=float, default=100)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0)
+    parser.add_argument('--workers', type=int, default=2, help='outbox worker threads')
+    parser.add_argument('--rate', type=float, default=0, help='SMS_RATE_PER_SECOND (0 = unlimited)')
+    parser.add_argument('--timeout', type=float, default=300, help='seconds to wait for each size to drain')
+    parser.add_argument('--database-uri', default=None, help='defaults to a scratch SQLite file')
+    return parser.parse_args()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def seed(db, User, Donor, Request, sizes):
+    """Create a requester plus one district of `size` O+ donors per size; returns (user id, {size: request id})"""
+    db.drop_all()
+    db.create_all()
+    now = datetime.utcnow()
+
+    requester = User(username='bench', email='bench@example.com', user_type='requester', phone='9000000000')
+    requester.set_password('bench')
+    db.session.add(requester)
+    db.session.flush()
+
+    total = sum(sizes)
+    db.session.execute(User.__table__.insert(), [
+        {'username': f'donor{i}', 'email': f'donor{i}@example.com', 'password_hash': 'x',
+         'user_type': 'donor', 'phone': f'+91{i:010d}', 'created_at': now}
+        for i in range(total)
+    ])
+    donor_user_ids = [row.id for row in db.session.query(User.id).filter(User.user_type == 'donor').order_by(User.id)]
+
+    request_ids = {}
+    offset = 0
+    for size in sizes:
+        district = f'Bench {size}'
+        db.session.execute(Donor.__table__.insert(), [
+            {'user_id': donor_user_ids[offset + i], 'name': f'Donor {offset + i}', 'blood_group': 'O+',
+             'phone': f'+91{offset + i:010d}', 'district': district, 'hospital': 'Bench Hospital',
+             'is_available': True, 'registered_at': now, 'auto_remove_date': now + timedelta(days=14)}
+            for i in range(size)
+        ])
+        offset += size
+
+        blood_request = Request(user_id=requester.id, requester_name='Bench', blood_group='O+',
+                                district=district, hospital='Bench Hospital', phone='9000000000',
+                                urgency='critical')
+        db.session.add(blood_request)
+        db.session.flush()
+        request_ids[size] = blood_request.id
+
+    db.session.commit()
+    return requester.id, request_ids
+
+
+def main():
+    args = parse_args()
+    server = start_fake_provider(
+        latency=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate
+    )
+
+    scratch = None
+    if args.database_uri:
+        Config.SQLALCHEMY_DATABASE_URI = args.database_uri
+    else:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        Config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{scratch.name}'
+        Config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+    Config.SMS_TRANSPORT = 'http_fake'
+    Config.SMS_FAKE_PROVIDER_URL = server.url
+    Config.OUTBOX_POLL_SECONDS = 0.05
+    Config.OUTBOX_BACKOFF_SECONDS = 1
+    Config.SMS_RATE_PER_SECOND = args.rate
+
+    from app import create_app
+    from models import db, User, Donor, Request, NotificationJob, OutboxMessage
+    from services.outbox import start_workers
+
+    # Outbox workers are started once the scratch tables exist
+    app = create_app(start_background=False)
+    with app.app_context():
+        user_id, request_ids = seed(db, User, Donor, Request, args.fanout)
+    start_workers(app, args.workers)
+    token = jwt.encode({'user_id': user_id, 'exp': datetime.utcnow() + timedelta(hours=1)},
+                       Config.SECRET_KEY, algorithm='HS256')
+    headers = {'Authorization': f'Bearer {token}'}
+    client = app.test_client()
+
+    print(f"fake provider: {args.latency_ms:.0f} ms, error rate {args.error_rate}, "
+          f"429 rate {args.throttle_rate}; {args.workers} outbox worker(s)")
+    print(f"{'fanout':>7} {'calls':>5} {'post p50':>9} {'post p99':>9} {'sent':>6} {'dead':>5} "
+          f"{'notif/s':>8} {'p99 ms':>8}")
+
+    for size in args.fanout:
+        post_times = []
+        job_ids = []
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            response = client.post('/api/notify/request-donors', json={'request_id': request_ids[size]}, headers=headers)
+            post_times.append(time.perf_counter() - t0)
+            job_ids.append(response.get_json()['job_id'])
+
+        with app.app_context():
+            deadline = time.monotonic() + args.timeout
+            while time.monotonic() < deadline:
+                open_jobs = NotificationJob.query.filter(
+                    NotificationJob.id.in_(job_ids), NotificationJob.status != 'completed'
+                ).count()
+                db.session.rollback()
+                if not open_jobs:
+                    break
+                time.sleep(0.05)
+            elapsed = time.perf_counter() - start
+
+            messages = OutboxMessage.query.with_entities(
+                OutboxMessage.status, OutboxMessage.created_at, OutboxMessage.sent_at
+            ).filter(OutboxMessage.job_id.in_(job_ids)).all()
+            db.session.rollback()
+
+        sent = [m for m in messages if m.status == 'sent']
+        dead = sum(1 for m in messages if m.status == 'dead')
+        delivery = [(m.sent_at - m.created_at).total_seconds() for m in sent]
+        print(f"{size:>7} {args.requests:>5} {statistics.median(post_times) * 1000:>8.1f}ms "
+              f"{percentile(post_times, 0.99) * 1000:>7.1f}ms {len(sent):>6} {dead:>5} "
+              f"{len(sent) / elapsed:>8.1f} {percentile(delivery, 0.99) * 1000:>8.0f}")
+
+    server.shutdown()
+    if scratch:
+        os.unlink(scratch.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: ORM + to_dict() + jsonify vs. column projection + fast JSON
+for the donor list endpoint.
+
+Seeds N available donors into a scratch database (in-memory SQLite by
+default) and measures, for each read path, the median latency over a few
+runs and the peak Python memory allocated while building one response.
+
+    python benchmarks/bench_read_path.py
+    python benchmarks/bench_read_path.py --rows 10000 100000 --runs 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import Config
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--database-uri', default='sqlite://')
+    return parser.parse_args()
+
+
+def seed(db, Donor, rows):
+    db.drop_all()
+    db.create_all()
+    now = datetime.utcnow()
+    groups = ['A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+', 'O-']
+    db.session.execute(Donor.__table__.insert(), [
+        {
+            'user_id': i + 1,
+            'name': f'Donor {i}',
+            'blood_group': groups[i % len(groups)],
+            'phone': f'+91{i:010d}',
+            'district': 'Chennai',
+            'hospital': 'Apollo Hospitals Chennai',
+            'latitude': 13.0 + (i % 1000) / 1000,
+            'longitude': 80.0 + (i // 1000 % 1000) / 1000,
+            'is_available': True,
+            'registered_at': now - timedelta(minutes=i),
+            'auto_remove_date': now + timedelta(days=14),
+        }
+        for i in range(rows)
+    ])
+    db.session.commit()
+
+
+def measure(fn, runs):
+    """(median seconds, peak traced bytes, response bytes)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak, len(body)
+
+
+def main():
+    args = parse_args()
+    Config.SQLALCHEMY_DATABASE_URI = args.database_uri
+    Config.SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    from flask import jsonify
+    from app import create_app
+    from models import db, Donor
+    from routes.donor_routes import _donor_listing
+
+    def orm_path():
+        donors = Donor.query.filter_by(is_available=True).all()
+        body = jsonify({
+            'donors': [donor.to_dict() for donor in donors],
+            'count': len(donors)
+        }).get_data()
+        db.session.expunge_all()
+        return body
+
+    def projection_path():
+        return _donor_listing(Donor.query.filter_by(is_available=True)).get_data()
+
+    app = create_app(start_background=False)
+    print(f"{'rows':>8}  {'path':<12} {'median ms':>10} {'peak MiB':>9} {'body MiB':>9}")
+    with app.app_context():
+        for rows in args.rows:
+            seed(db, Donor, rows)
+            with app.test_request_context('/api/donors/all'):
+                for name, fn in (('orm', orm_path), ('projection', projection_path)):
+                    seconds, peak, size = measure(fn, args.runs)
+                    print(f"{rows:>8}  {name:<12} {seconds * 1000:>10.1f} {peak / 2**20:>9.1f} {size / 2**20:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: sequential vs. bounded-concurrency SMS fan-out.
+
+Starts the local fake SMS provider, answering every POST after a fixed
+latency, then sends one message per recipient through
+dispatcher.fan_out() at several parallelism limits and reports the
+end-to-end time.
+
+    python benchmarks/bench_sms_fanout.py
+    python benchmarks/bench_sms_fanout.py --recipients 300 --latency-ms 200
+"""
+import argparse
+import os
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from services.dispatch import PriorityDispatcher
+from fake_sms_provider import start_fake_provider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--recipients', type=int, default=300)
+    parser.add_argument('--latency-ms', type=float, default=200)
+    parser.add_argument('--parallelism', type=int, nargs='+', default=[1, 8, 16, 32])
+    parser.add_argument('--timeout', type=float, default=10)
+    args = parser.parse_args()
+
+    server = start_fake_provider(latency=args.latency_ms / 1000)
+    url = server.url
+
+    def send(phone):
+        data = f'To={phone}&Body=benchmark'.encode('ascii')
+        with urllib.request.urlopen(url, data=data, timeout=args.timeout) as response:
+            return {'success': response.status == 201}
+
+    phones = [f'+91{i:010d}' for i in range(args.recipients)]
+    dispatcher = PriorityDispatcher(max(args.parallelism), {})
+
+    print(f"{args.recipients} recipients, {args.latency_ms:.0f} ms per send")
+    print(f"{'parallelism':>11} {'seconds':>8} {'sends/s':>8} {'ok':>5}")
+    for parallelism in args.parallelism:
+        start = time.perf_counter()
+        results = dispatcher.fan_out('critical', send, phones, parallelism, args.timeout)
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for r in results if isinstance(r, dict) and r['success'])
+        print(f"{parallelism:>11} {elapsed:>8.2f} {len(phones) / elapsed:>8.1f} {ok:>5}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
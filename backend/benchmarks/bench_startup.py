@@ -0,0 +1,77 @@
+"""
+Benchmark: cold start of the backend and its tooling.
+
+Runs each scenario in a fresh interpreter several times and reports the
+median wall time, so it covers imports, app construction and (for the
+first request) starting the background jobs. With --importtime it also
+lists the slowest top-level imports behind create_app().
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --importtime
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCENARIOS = [
+    ('python (baseline)', 'pass'),
+    ('import app', 'import app'),
+    ('create_app()', 'from app import create_app; create_app()'),
+    ('first request', 'from app import create_app; create_app().test_client().get("/api/health")'),
+    ('setup_database import', 'import setup_database'),
+    ('explain_queries import', 'import explain_queries'),
+]
+
+
+def run(code, env, extra_args=()):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *extra_args, '-c', code], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f'{code!r} failed:\n{result.stderr}')
+    return elapsed, result.stderr
+
+
+def slowest_imports(env, top):
+    """(cumulative microseconds, module) for the slowest top-level imports of create_app()"""
+    _, stderr = run('from app import create_app; create_app()', env, ('-X', 'importtime'))
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Direct imports are indented by exactly one level
+        if name.startswith('   ') and not name.startswith('    '):
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--importtime', action='store_true')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    # Keep the first-request scenario from opening database connections
+    env = dict(os.environ, OUTBOX_WORKERS='0')
+
+    print(f"{'scenario':<24} {'median ms':>10} {'min ms':>8}")
+    for name, code in SCENARIOS:
+        timings = [run(code, env)[0] for _ in range(args.runs)]
+        print(f"{name:<24} {statistics.median(timings) * 1000:>10.0f} {min(timings) * 1000:>8.0f}")
+
+    if args.importtime:
+        print("\nSlowest imports behind create_app():")
+        for cumulative, module in slowest_imports(env, args.top):
+            print(f"{cumulative / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Local fake SMS provider for offline load tests.
+
+Accepts POST /Messages.json (form fields To, Body) like the Twilio API and
+answers after a configurable latency. A share of requests can fail with
+500 (--error-rate) or be throttled with 429 (--throttle-rate), and
+--max-rate answers 429 to anything above that many messages per second,
+like a provider enforcing its account limit. GET /stats returns the
+counters.
+
+Run it and point the backend at it:
+
+    python benchmarks/fake_sms_provider.py --port 8025 --latency-ms 150 --max-rate 50
+    SMS_TRANSPORT=http_fake SMS_FAKE_PROVIDER_URL=http://127.0.0.1:8025/Messages.json flask run
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.rate_limit import TokenBucket
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, max_rate=0):
+        super().__init__(address, FakeProviderHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.bucket = TokenBucket(max_rate, max_rate) if max_rate > 0 else None
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.counters = {'received': 0, 'sent': 0, 'errors': 0, 'throttled': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.counters[key] += 1
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}/Messages.json'
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/stats':
+            self._reply(404, {'message': 'Not found'})
+            return
+        with self.server.lock:
+            self._reply(200, dict(self.server.counters))
+
+    def do_POST(self):
+        server = self.server
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server.count('received')
+
+        if server.bucket and not server.bucket.acquire(timeout=0):
+            server.count('throttled')
+            self._reply(429, {'message': 'Too Many Requests'}, {'Retry-After': '1'})
+            return
+
+        time.sleep(max(server.latency + random.uniform(-server.jitter, server.jitter), 0))
+
+        roll = random.random()
+        if roll < server.throttle_rate:
+            server.count('throttled')
+            self._reply(429, {'message': 'Too Many Requests'}, {'Retry-After': '1'})
+        elif roll < server.throttle_rate + server.error_rate:
+            server.count('errors')
+            self._reply(500, {'message': 'Internal provider error'})
+        else:
+            server.count('sent')
+            self._reply(201, {'sid': f'SMfake{next(server.ids)}', 'status': 'queued'})
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_provider(port=0, **options):
+    """Start the fake provider in a background thread; returns the server (see .url)"""
+    server = FakeProviderServer(('127.0.0.1', port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--throttle-rate', type=float, default=0)
+    parser.add_argument('--max-rate', type=float, default=0, help='messages/second before answering 429 (0 = unlimited)')
+    args = parser.parse_args()
+
+    server = FakeProviderServer(
+        ('127.0.0.1', args.port),
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rate=args.max_rate
+    )
+    print(f"Fake SMS provider listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -31,3 +31,93 @@ class Config:
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN", "")
     TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER", "")
 
+    # Keyset pagination for list endpoints
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+    # Radius search for /api/donors/nearby
+    DEFAULT_NEARBY_RADIUS_KM = float(os.getenv("DEFAULT_NEARBY_RADIUS_KM", "10"))
+    MAX_NEARBY_RADIUS_KM = float(os.getenv("MAX_NEARBY_RADIUS_KM", "100"))
+
+    # Donor map clustering
+    MAP_CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", "14"))
+    MAP_TILE_TTL = int(os.getenv("MAP_TILE_TTL", "300"))
+
+    # Reconciliation intervals (minutes) for the in-memory availability
+    # counters and the materialized dashboard counters
+    AVAILABILITY_RECONCILE_MINUTES = int(os.getenv("AVAILABILITY_RECONCILE_MINUTES", "10"))
+    DASHBOARD_RECONCILE_MINUTES = int(os.getenv("DASHBOARD_RECONCILE_MINUTES", "10"))
+
+    # Analytics rollups: run interval (minutes), how far behind now a run
+    # stops (seconds), and the default range of the analytics endpoints (days)
+    ANALYTICS_ROLLUP_MINUTES = int(os.getenv("ANALYTICS_ROLLUP_MINUTES", "5"))
+    ANALYTICS_LAG_SECONDS = int(os.getenv("ANALYTICS_LAG_SECONDS", "60"))
+    ANALYTICS_DEFAULT_DAYS = int(os.getenv("ANALYTICS_DEFAULT_DAYS", "30"))
+
+    # Ranked donor matching (/api/requests/<id>/match-donors?top=k)
+    MATCH_WEIGHTS = {
+        'distance': float(os.getenv("MATCH_WEIGHT_DISTANCE", "0.5")),
+        'recency': float(os.getenv("MATCH_WEIGHT_RECENCY", "0.2")),
+        'expiry': float(os.getenv("MATCH_WEIGHT_EXPIRY", "0.3")),
+    }
+    MATCH_DISTANCE_SCALE_KM = float(os.getenv("MATCH_DISTANCE_SCALE_KM", "10"))
+    URGENCY_DISTANCE_FACTOR = {'normal': 1.0, 'urgent': 1.5, 'critical': 2.0}
+
+    # Widening donor search: keep adding rings of neighbouring districts until
+    # this many donors match, crossing at most MATCH_MAX_RING district borders
+    MATCH_TARGET_DONORS = int(os.getenv("MATCH_TARGET_DONORS", "10"))
+    MATCH_MAX_RING = int(os.getenv("MATCH_MAX_RING", "3"))
+
+    # Notification dispatch: worker threads and weighted share per urgency
+    DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", "32"))
+    DISPATCH_WEIGHTS = {
+        'critical': int(os.getenv("DISPATCH_WEIGHT_CRITICAL", "8")),
+        'urgent': int(os.getenv("DISPATCH_WEIGHT_URGENT", "3")),
+        'normal': int(os.getenv("DISPATCH_WEIGHT_NORMAL", "1")),
+    }
+
+    # Upper bound on items in POST /api/requests/bulk
+    MAX_BULK_REQUESTS = int(os.getenv("MAX_BULK_REQUESTS", "200"))
+
+    # SMS fan-out: sends in flight per notify call and per-send timeout (seconds)
+    SMS_FANOUT_CONCURRENCY = int(os.getenv("SMS_FANOUT_CONCURRENCY", "16"))
+    SMS_SEND_TIMEOUT = float(os.getenv("SMS_SEND_TIMEOUT", "10"))
+
+    # SMS transport: 'twilio', 'memory', 'http_fake' or 'log'; empty picks
+    # Twilio when its credentials are set, else 'log' (mock mode)
+    SMS_TRANSPORT = os.getenv("SMS_TRANSPORT", "")
+    SMS_FAKE_PROVIDER_URL = os.getenv("SMS_FAKE_PROVIDER_URL", "http://127.0.0.1:8025/Messages.json")
+
+    # SMS rate limit shared by all senders in a process (0 disables): messages
+    # per second, burst size, longest wait for a slot, and the pause after a 429
+    SMS_RATE_PER_SECOND = float(os.getenv("SMS_RATE_PER_SECOND", "10"))
+    SMS_RATE_BURST = int(os.getenv("SMS_RATE_BURST", "20"))
+    SMS_RATE_MAX_WAIT = float(os.getenv("SMS_RATE_MAX_WAIT", "5"))
+    SMS_THROTTLE_PAUSE_SECONDS = float(os.getenv("SMS_THROTTLE_PAUSE_SECONDS", "1"))
+
+    # Notification outbox: in-process worker threads, claim batch size,
+    # idle poll interval, retries with exponential backoff (seconds), and
+    # how long a claim may be held before another worker takes it over
+    OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "1"))
+    OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+    OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "2"))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+    OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+    OUTBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv("OUTBOX_CLAIM_TIMEOUT_SECONDS", "300"))
+
+    # Hospital catalog: how often (seconds) to check the hospitals table version
+    HOSPITAL_CATALOG_CHECK_SECONDS = float(os.getenv("HOSPITAL_CATALOG_CHECK_SECONDS", "5"))
+    HOSPITAL_SEARCH_LIMIT = int(os.getenv("HOSPITAL_SEARCH_LIMIT", "10"))
+    HOSPITAL_SEARCH_MAX_LIMIT = int(os.getenv("HOSPITAL_SEARCH_MAX_LIMIT", "50"))
+    # Versioned catalog URLs never change content; the district list only changes on deploy
+    HOSPITAL_CATALOG_IMMUTABLE_MAX_AGE = int(os.getenv("HOSPITAL_CATALOG_IMMUTABLE_MAX_AGE", "31536000"))
+    DISTRICTS_MAX_AGE = int(os.getenv("DISTRICTS_MAX_AGE", "86400"))
+
+    # gzip responses of these types once they reach COMPRESS_MIN_SIZE bytes
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+    COMPRESS_MIMETYPES = [
+        'application/json', 'application/javascript', 'text/html', 'text/plain',
+        'text/css', 'text/csv', 'image/svg+xml'
+    ]
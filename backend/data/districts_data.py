@@ -0,0 +1,101 @@
+"""
+Tamil Nadu district reference data
+- Approximate coordinates of each district headquarters (latitude, longitude)
+- Land borders between districts (adjacency list)
+- Common alternative spellings and old names of districts and towns
+"""
+
+DISTRICT_COORDINATES = {
+    "Ariyalur": (11.1401, 79.0786),
+    "Chennai": (13.0827, 80.2707),
+    "Coimbatore": (11.0168, 76.9558),
+    "Cuddalore": (11.7480, 79.7714),
+    "Dharmapuri": (12.1211, 78.1582),
+    "Dindigul": (10.3673, 77.9803),
+    "Erode": (11.3410, 77.7172),
+    "Kanchipuram": (12.8342, 79.7036),
+    "Kanyakumari": (8.1833, 77.4119),
+    "Karur": (10.9601, 78.0766),
+    "Krishnagiri": (12.5186, 78.2137),
+    "Madurai": (9.9252, 78.1198),
+    "Nagapattinam": (10.7672, 79.8449),
+    "Namakkal": (11.2189, 78.1674),
+    "Nilgiris": (11.4102, 76.6950),
+    "Perambalur": (11.2342, 78.8807),
+    "Pudukkottai": (10.3797, 78.8205),
+    "Ramanathapuram": (9.3639, 78.8395),
+    "Salem": (11.6643, 78.1460),
+    "Sivaganga": (9.8433, 78.4809),
+    "Thanjavur": (10.7870, 79.1378),
+    "Theni": (10.0104, 77.4768),
+    "Thoothukudi": (8.7642, 78.1348),
+    "Tiruchirappalli": (10.7905, 78.7047),
+    "Tirunelveli": (8.7139, 77.7567),
+    "Tirupur": (11.1085, 77.3411),
+    "Tiruvallur": (13.1231, 79.9120),
+    "Tiruvannamalai": (12.2253, 79.0747),
+    "Tiruvarur": (10.7661, 79.6344),
+    "Vellore": (12.9165, 79.1325),
+    "Viluppuram": (11.9401, 79.4861),
+    "Virudhunagar": (9.5680, 77.9624),
+}
+
+
+# Districts sharing a land border; each pair is listed once and the graph
+# built from it is undirected
+DISTRICT_BORDERS = [
+    ("Chennai", "Tiruvallur"), ("Chennai", "Kanchipuram"),
+    ("Tiruvallur", "Kanchipuram"), ("Tiruvallur", "Vellore"),
+    ("Kanchipuram", "Vellore"), ("Kanchipuram", "Tiruvannamalai"), ("Kanchipuram", "Viluppuram"),
+    ("Vellore", "Tiruvannamalai"), ("Vellore", "Krishnagiri"),
+    ("Tiruvannamalai", "Viluppuram"), ("Tiruvannamalai", "Krishnagiri"), ("Tiruvannamalai", "Dharmapuri"),
+    ("Viluppuram", "Cuddalore"), ("Viluppuram", "Salem"), ("Viluppuram", "Perambalur"),
+    ("Cuddalore", "Perambalur"), ("Cuddalore", "Ariyalur"), ("Cuddalore", "Nagapattinam"),
+    ("Krishnagiri", "Dharmapuri"),
+    ("Dharmapuri", "Salem"),
+    ("Salem", "Perambalur"), ("Salem", "Tiruchirappalli"), ("Salem", "Namakkal"), ("Salem", "Erode"),
+    ("Namakkal", "Erode"), ("Namakkal", "Karur"), ("Namakkal", "Tiruchirappalli"),
+    ("Erode", "Karur"), ("Erode", "Tirupur"), ("Erode", "Coimbatore"), ("Erode", "Nilgiris"),
+    ("Nilgiris", "Coimbatore"),
+    ("Coimbatore", "Tirupur"),
+    ("Tirupur", "Karur"), ("Tirupur", "Dindigul"),
+    ("Karur", "Tiruchirappalli"), ("Karur", "Dindigul"),
+    ("Tiruchirappalli", "Perambalur"), ("Tiruchirappalli", "Ariyalur"), ("Tiruchirappalli", "Thanjavur"),
+    ("Tiruchirappalli", "Pudukkottai"), ("Tiruchirappalli", "Dindigul"),
+    ("Perambalur", "Ariyalur"),
+    ("Ariyalur", "Thanjavur"),
+    ("Thanjavur", "Tiruvarur"), ("Thanjavur", "Nagapattinam"), ("Thanjavur", "Pudukkottai"),
+    ("Tiruvarur", "Nagapattinam"), ("Tiruvarur", "Pudukkottai"),
+    ("Pudukkottai", "Sivaganga"), ("Pudukkottai", "Ramanathapuram"),
+    ("Dindigul", "Madurai"), ("Dindigul", "Theni"),
+    ("Madurai", "Theni"), ("Madurai", "Virudhunagar"), ("Madurai", "Sivaganga"),
+    ("Theni", "Virudhunagar"),
+    ("Sivaganga", "Ramanathapuram"), ("Sivaganga", "Virudhunagar"),
+    ("Ramanathapuram", "Virudhunagar"), ("Ramanathapuram", "Thoothukudi"),
+    ("Virudhunagar", "Thoothukudi"), ("Virudhunagar", "Tirunelveli"),
+    ("Thoothukudi", "Tirunelveli"),
+    ("Tirunelveli", "Kanyakumari"),
+]
+
+# Alternative spelling or old name -> district name as used above
+DISTRICT_ALIASES = {
+    "Madras": "Chennai",
+    "Kovai": "Coimbatore",
+    "Dindugal": "Dindigul",
+    "Kancheepuram": "Kanchipuram",
+    "Kanniyakumari": "Kanyakumari",
+    "Nagercoil": "Kanyakumari",
+    "Ooty": "Nilgiris",
+    "Udhagamandalam": "Nilgiris",
+    "Sivagangai": "Sivaganga",
+    "Tanjore": "Thanjavur",
+    "Tuticorin": "Thoothukudi",
+    "Trichy": "Tiruchirappalli",
+    "Tiruchi": "Tiruchirappalli",
+    "Nellai": "Tirunelveli",
+    "Tiruppur": "Tirupur",
+    "Thiruvallur": "Tiruvallur",
+    "Thiruvannamalai": "Tiruvannamalai",
+    "Thiruvarur": "Tiruvarur",
+    "Villupuram": "Viluppuram",
+}
@@ -0,0 +1,111 @@
+"""
+Index check for BloodLink TN hot queries
+- Builds the query each route runs
+- Runs EXPLAIN on it against the configured database
+- Fails if any of them falls back to a full table scan
+
+Run against a database with realistic data (the optimizer may prefer a
+table scan on near-empty tables):
+    python explain_queries.py
+"""
+from datetime import datetime, timedelta
+import sys
+
+from sqlalchemy import or_, text
+
+from app import create_app
+from models import db, Donor, Request, OutboxMessage
+from utils.geo import bounding_box, covering_cells
+
+SAMPLE_BLOOD_GROUP = 'O+'
+SAMPLE_DISTRICT = 'Chennai'
+SAMPLE_USER_ID = 1
+SAMPLE_PAGE_SIZE = 50
+
+
+def hot_queries():
+    """(name, select statement) for every hot access path"""
+    available = Donor.query.filter_by(is_available=True)
+    south, west, north, east = bounding_box(13.0827, 80.2707, 10)
+    nearby_cells = covering_cells(south, west, north, east)
+
+    return [
+        ('donors: match by blood group and district', Donor.query.filter_by(
+            blood_group=SAMPLE_BLOOD_GROUP, district=SAMPLE_DISTRICT, is_available=True)),
+        ('donors: /all page', available.order_by(
+            Donor.registered_at.desc(), Donor.id.desc()).limit(SAMPLE_PAGE_SIZE)),
+        ('donors: /all next page', available.filter(
+            Donor.registered_at < datetime.utcnow()).order_by(
+            Donor.registered_at.desc(), Donor.id.desc()).limit(SAMPLE_PAGE_SIZE)),
+        ('donors: my profile', Donor.query.filter_by(user_id=SAMPLE_USER_ID)),
+        ('donors: nearby', available.filter(
+            or_(*[Donor.geohash.like(cell + '%') for cell in nearby_cells]))),
+        ('donors: expiry job', Donor.query.filter(
+            Donor.auto_remove_date < datetime.utcnow(), Donor.is_available == True)),
+        ('requests: /all filtered', Request.query.filter_by(
+            status='pending', district=SAMPLE_DISTRICT, blood_group=SAMPLE_BLOOD_GROUP
+        ).order_by(Request.created_at.desc())),
+        ('requests: /all page', Request.query.order_by(
+            Request.created_at.desc(), Request.id.desc()).limit(SAMPLE_PAGE_SIZE)),
+        ('requests: /all by status page', Request.query.filter_by(status='pending').order_by(
+            Request.created_at.desc(), Request.id.desc()).limit(SAMPLE_PAGE_SIZE)),
+        ('requests: my requests', Request.query.filter_by(
+            user_id=SAMPLE_USER_ID).order_by(Request.created_at.desc())),
+        ('requests: rollup new requests', Request.query.filter(
+            Request.created_at > datetime.utcnow() - timedelta(minutes=5), Request.created_at <= datetime.utcnow())),
+        ('requests: rollup new fulfillments', Request.query.filter(
+            Request.status == 'fulfilled', Request.fulfilled_at > datetime.utcnow() - timedelta(minutes=5),
+            Request.fulfilled_at <= datetime.utcnow())),
+        ('outbox: claim batch', OutboxMessage.query.filter(
+            OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= datetime.utcnow()
+        ).order_by(OutboxMessage.priority.desc(), OutboxMessage.id).limit(SAMPLE_PAGE_SIZE)),
+    ]
+
+
+def explain(query):
+    """Return (plan lines, uses_full_scan) for an ORM query"""
+    compiled = query.statement.compile(compile_kwargs={'render_postcompile': True})
+    dialect = db.engine.dialect.name
+
+    if dialect == 'sqlite':
+        rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + str(compiled)), compiled.params).fetchall()
+        plan = [row[-1] for row in rows]
+        full_scan = any(
+            line.startswith('SCAN ') and 'USING' not in line
+            for line in plan
+        )
+        return plan, full_scan
+
+    rows = db.session.execute(text('EXPLAIN ' + str(compiled)), compiled.params).mappings().fetchall()
+    plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+    full_scan = any(row['type'] == 'ALL' for row in rows)
+    return plan, full_scan
+
+
+def check_indexes():
+    print("=" * 60)
+    print("BloodLink TN - Query Index Check")
+    print("=" * 60)
+
+    failures = 0
+    app = create_app(start_background=False)
+    with app.app_context():
+        for name, query in hot_queries():
+            plan, full_scan = explain(query)
+            print(f"\n{'❌' if full_scan else '✅'} {name}")
+            for line in plan:
+                print(f"   {line}")
+            if full_scan:
+                failures += 1
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ {failures} query(s) use a full table scan")
+    else:
+        print("✅ All hot queries use an index")
+    print("=" * 60)
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check_indexes() else 0)
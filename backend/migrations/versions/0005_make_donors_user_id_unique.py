@@ -0,0 +1,35 @@
+"""make donors user_id unique
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 20:49:01.831625
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the newest donor profile per user before enforcing uniqueness
+    op.execute(
+        "DELETE FROM donors WHERE id NOT IN "
+        "(SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM donors GROUP BY user_id) AS latest)"
+    )
+
+    # Create the unique index before dropping the old one: on MySQL the old index
+    # backs the users.id foreign key and cannot be dropped while it is the only one
+    with op.batch_alter_table('donors', schema=None) as batch_op:
+        batch_op.create_index('ix_donors_user_id_unique', ['user_id'], unique=True)
+        batch_op.drop_index(batch_op.f('ix_donors_user_id'))
+
+
+def downgrade():
+    with op.batch_alter_table('donors', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_donors_user_id'), ['user_id'], unique=False)
+        batch_op.drop_index('ix_donors_user_id_unique')
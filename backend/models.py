@@ -1,6 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
+from utils.geo import geohash_encode
 
 db = SQLAlchemy()
 
@@ -34,6 +36,18 @@ class User(db.Model):
 
 class Donor(db.Model):
     __tablename__ = 'donors'
+    __table_args__ = (
+        # Matching: blood_group + district + is_available (also covers COUNT)
+        db.Index('ix_donors_match', 'blood_group', 'district', 'is_available'),
+        # Listings: available donors paged by (registered_at, id)
+        db.Index('ix_donors_available_registered', 'is_available', 'registered_at', 'id'),
+        # Radius search and map tiles: available donors by geohash prefix
+        db.Index('ix_donors_available_geohash', 'is_available', 'geohash'),
+        # Expiry job: available donors past auto_remove_date
+        db.Index('ix_donors_available_expiry', 'is_available', 'auto_remove_date'),
+        # One profile per user; also the index backing the users.id foreign key
+        db.Index('ix_donors_user_id_unique', 'user_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -44,6 +58,7 @@ class Donor(db.Model):
     hospital = db.Column(db.String(150), nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True)
     is_available = db.Column(db.Boolean, default=True)
     registered_at = db.Column(db.DateTime, default=datetime.utcnow)
     auto_remove_date = db.Column(db.DateTime, default=lambda: datetime.utcnow() + timedelta(days=14))
@@ -71,8 +86,36 @@ class Donor(db.Model):
         }
 
 
+# Columns returned by Donor.to_dict(), for list endpoints that skip the ORM
+DONOR_COLUMNS = (
+    Donor.id, Donor.user_id, Donor.name, Donor.blood_group, Donor.phone,
+    Donor.district, Donor.hospital, Donor.latitude, Donor.longitude,
+    Donor.is_available, Donor.registered_at, Donor.auto_remove_date
+)
+
+
+@event.listens_for(Donor, 'before_insert')
+@event.listens_for(Donor, 'before_update')
+def _sync_donor_geohash(mapper, connection, target):
+    """Keep the indexed geohash column in step with latitude/longitude"""
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+    else:
+        target.geohash = None
+
+
 class Request(db.Model):
     __tablename__ = 'requests'
+    __table_args__ = (
+        # Listings: newest first, optionally narrowed by status/district/blood_group
+        db.Index('ix_requests_created', 'created_at', 'id'),
+        db.Index('ix_requests_status_created', 'status', 'created_at', 'id'),
+        db.Index('ix_requests_district_group_status', 'district', 'blood_group', 'status', 'created_at'),
+        # My requests: a user's requests, newest first
+        db.Index('ix_requests_user_created', 'user_id', 'created_at'),
+        # Analytics rollups: requests fulfilled since the last run
+        db.Index('ix_requests_status_fulfilled', 'status', 'fulfilled_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -104,8 +147,20 @@ class Request(db.Model):
         }
 
 
+# Columns returned by Request.to_dict(), for list endpoints that skip the ORM
+REQUEST_COLUMNS = (
+    Request.id, Request.user_id, Request.requester_name, Request.blood_group,
+    Request.district, Request.hospital, Request.phone, Request.urgency,
+    Request.status, Request.created_at, Request.fulfilled_at
+)
+
+
 class Hospital(db.Model):
     __tablename__ = 'hospitals'
+    __table_args__ = (
+        # Seeding upserts on (district, name); also serves per-district lookups
+        db.Index('ix_hospitals_district_name', 'district', 'name', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
@@ -126,3 +181,108 @@ class Hospital(db.Model):
             'longitude': self.longitude
         }
 
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped by every write; drives ETags and caches"""
+    __tablename__ = 'table_versions'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class DashboardCounters(db.Model):
+    """Single row (id=1) of dashboard totals, kept in step by the write paths"""
+    __tablename__ = 'dashboard_counters'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    total_donors = db.Column(db.Integer, nullable=False, default=0)
+    available_donors = db.Column(db.Integer, nullable=False, default=0)
+    total_requests = db.Column(db.Integer, nullable=False, default=0)
+    fulfilled_requests = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        return {
+            'total_donors': self.total_donors,
+            'available_donors': self.available_donors,
+            'total_requests': self.total_requests,
+            'fulfilled_requests': self.fulfilled_requests
+        }
+
+
+class RequestRollup(db.Model):
+    """
+    Requests per hour or day, district and blood group, keyed by the hour or
+    day they were created in; fulfillments count against that same bucket
+    """
+    __tablename__ = 'request_rollups'
+    
+    granularity = db.Column(db.String(5), primary_key=True)  # 'hour', 'day'
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    district = db.Column(db.String(100), primary_key=True)
+    blood_group = db.Column(db.String(5), primary_key=True)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    fulfilled_count = db.Column(db.Integer, nullable=False, default=0)
+    # utils.sketch.QuantileSketch of fulfilled_at - created_at, in seconds
+    latency_sketch = db.Column(db.Text, nullable=True)
+
+
+class RollupWatermark(db.Model):
+    """How far each rollup has read its source, so a run only reads newer rows"""
+    __tablename__ = 'rollup_watermarks'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.DateTime, nullable=False)
+
+
+class NotificationJob(db.Model):
+    """One notify call: the batch of outbox messages sent for a request"""
+    __tablename__ = 'notification_jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('requests.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    urgency = db.Column(db.String(20), default='normal')
+    total = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), default='queued')  # 'queued', 'completed'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'request_id': self.request_id,
+            'user_id': self.user_id,
+            'urgency': self.urgency,
+            'total': self.total,
+            'status': self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+
+class OutboxMessage(db.Model):
+    """A single SMS waiting to be sent, claimed and retried by the outbox workers"""
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        # Claiming: due pending messages, highest priority first
+        db.Index('ix_outbox_claim', 'status', 'priority', 'next_attempt_at'),
+        # Job progress: messages of a job by status
+        db.Index('ix_outbox_job_status', 'job_id', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('notification_jobs.id'), nullable=False)
+    donor_id = db.Column(db.Integer, nullable=True)
+    phone = db.Column(db.String(15), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    urgency = db.Column(db.String(20), default='normal')
+    priority = db.Column(db.SmallInteger, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # 'pending', 'sending', 'sent', 'dead'
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(64), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(255), nullable=True)
+    provider_sid = db.Column(db.String(64), nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,117 @@
+from flask import Blueprint, request, jsonify
+from config import Config
+from services.analytics import (
+    GRANULARITIES, CREATED_WATERMARK, FULFILLED_WATERMARK,
+    get_watermarks, request_series, fulfillment_rates, latency_percentiles
+)
+from utils.fastjson import json_response, precomputed_response
+from datetime import datetime, timedelta, timezone
+
+analytics_bp = Blueprint('analytics', __name__)
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _parse_utc(value):
+    """ISO date or datetime as naive UTC (timestamps are stored naive UTC); offsets are converted"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _range_args():
+    """(granularity, start, end) from the query string; raises ValueError with a message"""
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    try:
+        end = _parse_utc(request.args['end']) if 'end' in request.args else datetime.utcnow()
+        start = (_parse_utc(request.args['start']) if 'start' in request.args
+                 else end - timedelta(days=Config.ANALYTICS_DEFAULT_DAYS))
+    except ValueError:
+        raise ValueError('start and end must be ISO dates (YYYY-MM-DD or YYYY-MM-DDTHH:MM)')
+    if start >= end:
+        raise ValueError('start must be before end')
+    return granularity, start, end
+
+
+def _as_of():
+    """Everything up to this time is included in the rollups"""
+    watermarks = get_watermarks()
+    return min(watermarks[CREATED_WATERMARK], watermarks[FULFILLED_WATERMARK])
+
+
+@analytics_bp.route('/requests', methods=['GET'])
+def get_request_series():
+    """Requests created and fulfilled per day (or hour) and district"""
+    try:
+        granularity, start, end = _range_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    series = request_series(granularity, start, end, request.args.get('district'))
+    return json_response({
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'as_of': _as_of(),
+        'series': series
+    })
+
+
+@analytics_bp.route('/fulfillment', methods=['GET'])
+def get_fulfillment_rates():
+    """Fulfillment rate of requests created in the range, per district or blood group"""
+    by = request.args.get('by', 'district')
+    if by not in ('district', 'blood_group'):
+        return jsonify({'message': 'by must be district or blood_group'}), 400
+    try:
+        granularity, start, end = _range_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    rates = fulfillment_rates(granularity, start, end, by, request.args.get('district'))
+    return json_response({
+        'start': start,
+        'end': end,
+        'as_of': _as_of(),
+        'by': by,
+        'rates': rates
+    })
+
+
+@analytics_bp.route('/latency', methods=['GET'])
+def get_fulfillment_latency():
+    """Percentiles of fulfilled_at - created_at (seconds) per blood group"""
+    try:
+        granularity, start, end = _range_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        quantiles = (
+            [float(q) for q in request.args['quantiles'].split(',')]
+            if 'quantiles' in request.args else DEFAULT_QUANTILES
+        )
+    except ValueError:
+        return jsonify({'message': 'quantiles must be comma-separated numbers'}), 400
+    if not all(0 <= q <= 1 for q in quantiles):
+        return jsonify({'message': 'quantiles must be between 0 and 1'}), 400
+    
+    latency = latency_percentiles(granularity, start, end, quantiles, request.args.get('district'))
+    return json_response({
+        'start': start,
+        'end': end,
+        'as_of': _as_of(),
+        'unit': 'seconds',
+        'latency': latency
+    })
+
+
+@analytics_bp.route('/supply-demand', methods=['GET'])
+def get_supply_demand():
+    """Available donors against pending requests for every district and blood group"""
+    # Imported here so NumPy loads with the first call, not at app startup
+    from services.supply_demand import supply_demand
+    
+    return precomputed_response(*supply_demand.get())
@@ -1,10 +1,24 @@
 from flask import Blueprint, request, jsonify
-from models import db, Donor
+from sqlalchemy import case, func, or_, update
+from models import db, Donor, Hospital, DONOR_COLUMNS
 from routes.auth_routes import token_required
+from config import Config
+from utils.pagination import get_page_args, keyset_page
+from utils.fastjson import json_response, rows_to_dicts
+from utils.geo import haversine_km, bounding_box, covering_cells, geohash_encode
+from utils.upsert import upsert
+from services.map_tiles import tile_cache, build_clusters
+from services.availability import availability, donor_key
+from services.dashboard import adjust_counters
+from services.versions import bump_version, conditional_get
 from datetime import datetime, timedelta
+import heapq
 
 donor_bp = Blueprint('donor', __name__)
 
+# Added to LAST_INSERT_ID() by a MySQL re-registration; donors.id (INT) stays below it
+UPDATED_MARKER = 1 << 32
+
 
 @donor_bp.route('/register', methods=['POST'])
 @token_required
@@ -20,60 +34,82 @@ def register_donor(current_user):
         if field not in data:
             return jsonify({'message': f'{field} is required'}), 400
     
-    # Check if user already has a donor profile
-    existing_donor = Donor.query.filter_by(user_id=current_user.id).first()
-    
-    if existing_donor:
-        # Update existing donor
-        existing_donor.name = data['name']
-        existing_donor.blood_group = data['blood_group']
-        existing_donor.phone = data['phone']
-        existing_donor.district = data['district']
-        existing_donor.hospital = data['hospital']
-        existing_donor.latitude = data.get('latitude')
-        existing_donor.longitude = data.get('longitude')
-        existing_donor.is_available = True
-        existing_donor.registered_at = datetime.utcnow()
-        existing_donor.auto_remove_date = datetime.utcnow() + timedelta(days=14)
-        
-        try:
-            db.session.commit()
-            return jsonify({
-                'message': 'Donor profile updated successfully',
-                'donor': existing_donor.to_dict()
-            }), 200
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({'message': f'Update failed: {str(e)}'}), 500
-    else:
-        # Create new donor
-        donor = Donor(
-            user_id=current_user.id,
-            name=data['name'],
-            blood_group=data['blood_group'],
-            phone=data['phone'],
-            district=data['district'],
-            hospital=data['hospital'],
-            latitude=data.get('latitude'),
-            longitude=data.get('longitude'),
-            is_available=True,
-            registered_at=datetime.utcnow(),
-            auto_remove_date=datetime.utcnow() + timedelta(days=14)
+    now = datetime.utcnow()
+    values = {
+        'user_id': current_user.id,
+        'name': data['name'],
+        'blood_group': data['blood_group'],
+        'phone': data['phone'],
+        'district': data['district'],
+        'hospital': data['hospital'],
+        'latitude': data.get('latitude'),
+        'longitude': data.get('longitude'),
+        'is_available': True,
+        'registered_at': now,
+        'auto_remove_date': now + timedelta(days=14)
+    }
+    values['geohash'] = (
+        geohash_encode(values['latitude'], values['longitude'])
+        if values['latitude'] is not None and values['longitude'] is not None else None
+    )
+    
+    update_columns = [c for c in values if c != 'user_id']
+    existing = None
+    
+    # Insert or update in one statement, keyed on the unique donors.user_id
+    try:
+        if db.session.get_bind().dialect.name in ('mysql', 'mariadb'):
+            # LAST_INSERT_ID() reports the row id either way; an update adds
+            # UPDATED_MARKER, doubled when the replaced profile was available
+            previous = case((Donor.is_available == True, 2 * UPDATED_MARKER), else_=UPDATED_MARKER)
+            result = upsert(Donor, values, ['user_id'], update_columns,
+                            set_first={'id': func.last_insert_id(Donor.id + previous) - previous})
+            state, donor_id = divmod(result.lastrowid, UPDATED_MARKER)
+            updated, was_available = state > 0, state == 2
+        else:
+            # RETURNING only shows the new row here, so read the previous one first
+            existing = db.session.query(
+                Donor.district, Donor.blood_group, Donor.is_available, Donor.geohash
+            ).filter_by(user_id=current_user.id).with_for_update().first()
+            result = upsert(Donor, values, ['user_id'], update_columns, returning=[Donor.id])
+            donor_id = result.scalar_one()
+            updated, was_available = existing is not None, bool(existing and existing.is_available)
+        bump_version('donors')
+        adjust_counters(
+            total_donors=0 if updated else 1,
+            available_donors=int(values['is_available']) - int(was_available)
         )
-        
-        try:
-            db.session.add(donor)
-            db.session.commit()
-            return jsonify({
-                'message': 'Donor registered successfully',
-                'donor': donor.to_dict()
-            }), 201
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({'message': f'Registration failed: {str(e)}'}), 500
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Registration failed: {str(e)}'}), 500
+    
+    donor = Donor(id=donor_id, **values)
+    
+    tile_cache.invalidate(donor.geohash)
+    if existing:
+        tile_cache.invalidate(existing.geohash)
+        availability.donor_changed(donor_key(existing), donor_key(donor))
+    elif was_available:
+        # The replaced profile's district, blood group and location are unknown
+        tile_cache.clear()
+        availability.mark_stale()
+    else:
+        availability.donor_changed(None, donor_key(donor))
+    
+    if updated:
+        return jsonify({
+            'message': 'Donor profile updated successfully',
+            'donor': donor.to_dict()
+        }), 200
+    return jsonify({
+        'message': 'Donor registered successfully',
+        'donor': donor.to_dict()
+    }), 201
 
 
 @donor_bp.route('/all', methods=['GET'])
+@conditional_get('donors')
 def get_all_donors():
     """Get all available donors (public endpoint)"""
     available_only = request.args.get('available_only', 'true').lower() == 'true'
@@ -93,20 +129,19 @@ def get_all_donors():
     if district:
         query = query.filter_by(district=district)
     
-    donors = query.all()
-    
-    return jsonify({
-        'donors': [donor.to_dict() for donor in donors],
-        'count': len(donors)
-    }), 200
+    return _donor_listing(query)
 
 
 @donor_bp.route('/map', methods=['GET'])
+@conditional_get('donors')
 def get_donors_for_map():
     """Get available donors with location for map display"""
     blood_group = request.args.get('blood_group')
     district = request.args.get('district')
     
+    if 'bbox' in request.args or 'zoom' in request.args:
+        return _donor_map_viewport(blood_group, district)
+    
     query = Donor.query.filter_by(is_available=True)
     query = query.filter(Donor.latitude.isnot(None), Donor.longitude.isnot(None))
     
@@ -116,14 +151,162 @@ def get_donors_for_map():
     if district:
         query = query.filter_by(district=district)
     
-    donors = query.all()
+    return _donor_listing(query)
+
+
+def _donor_map_viewport(blood_group, district):
+    """Clusters (or individual donors at high zoom) inside bbox=south,west,north,east"""
+    try:
+        south, west, north, east = (float(v) for v in request.args['bbox'].split(','))
+        zoom = int(request.args['zoom'])
+    except KeyError:
+        return jsonify({'message': 'bbox and zoom are required'}), 400
+    except ValueError:
+        return jsonify({'message': 'bbox must be south,west,north,east and zoom an integer'}), 400
+    
+    if south > north or west > east:
+        return jsonify({'message': 'bbox must be south,west,north,east'}), 400
+    
+    if zoom < Config.MAP_CLUSTER_MAX_ZOOM:
+        cells = tile_cache.get_clusters(south, west, north, east, zoom, district)
+        clusters = build_clusters(cells, south, west, north, east, blood_group)
+        return jsonify({
+            'mode': 'clusters',
+            'zoom': zoom,
+            'clusters': clusters,
+            'count': sum(c['count'] for c in clusters)
+        }), 200
+    
+    query = Donor.query.filter_by(is_available=True)
+    query = query.filter(or_(*[Donor.geohash.like(cell + '%') for cell in covering_cells(south, west, north, east)]))
+    query = query.filter(
+        Donor.latitude.between(south, north),
+        Donor.longitude.between(west, east)
+    )
+    if blood_group:
+        query = query.filter_by(blood_group=blood_group)
+    if district:
+        query = query.filter_by(district=district)
+    
+    donors = query.with_entities(*DONOR_COLUMNS).limit(Config.MAX_PAGE_SIZE).all()
+    
+    return json_response({
+        'mode': 'donors',
+        'zoom': zoom,
+        'donors': rows_to_dicts(donors),
+        'count': len(donors)
+    })
+
+
+def _donor_listing(query):
+    """
+    Serialize a donor query, paging by (registered_at, id) when limit/cursor is given.
+    
+    Selects the to_dict() columns as plain rows, skipping ORM object
+    construction, and encodes them with the fast JSON encoder.
+    """
+    try:
+        page = get_page_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    query = query.with_entities(*DONOR_COLUMNS)
+    
+    if page is None:
+        donors = query.all()
+        return json_response({
+            'donors': rows_to_dicts(donors),
+            'count': len(donors)
+        })
+    
+    donors, next_cursor, count = keyset_page(query, Donor.registered_at, Donor.id, **page)
+    
+    return json_response({
+        'donors': rows_to_dicts(donors),
+        'count': count,
+        'next_cursor': next_cursor
+    })
+
+
+@donor_bp.route('/nearby', methods=['GET'])
+@conditional_get('donors', 'hospitals')
+def get_nearby_donors():
+    """Get available donors within radius_km of a point or hospital, nearest first"""
+    try:
+        radius_km = float(request.args.get('radius_km', Config.DEFAULT_NEARBY_RADIUS_KM))
+        limit = min(int(request.args.get('limit', Config.DEFAULT_PAGE_SIZE)), Config.MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'message': 'radius_km and limit must be numbers'}), 400
+    
+    if not 0 < radius_km <= Config.MAX_NEARBY_RADIUS_KM:
+        return jsonify({'message': f'radius_km must be between 0 and {Config.MAX_NEARBY_RADIUS_KM}'}), 400
+    if limit < 1:
+        return jsonify({'message': 'limit must be positive'}), 400
+    
+    hospital_id = request.args.get('hospital_id', type=int)
+    if hospital_id is not None:
+        hospital = Hospital.query.get(hospital_id)
+        if not hospital:
+            return jsonify({'message': 'Hospital not found'}), 404
+        if hospital.latitude is None or hospital.longitude is None:
+            return jsonify({'message': 'Hospital has no location'}), 400
+        lat, lon = hospital.latitude, hospital.longitude
+    else:
+        try:
+            lat = float(request.args['lat'])
+            lon = float(request.args['lon'])
+        except KeyError:
+            return jsonify({'message': 'lat and lon (or hospital_id) are required'}), 400
+        except ValueError:
+            return jsonify({'message': 'lat and lon must be numbers'}), 400
+    
+    # Narrow to the geohash cells covering the search box, then to the box itself
+    south, west, north, east = bounding_box(lat, lon, radius_km)
+    cells = covering_cells(south, west, north, east)
+    
+    query = Donor.query.filter_by(is_available=True)
+    query = query.filter(or_(*[Donor.geohash.like(cell + '%') for cell in cells]))
+    query = query.filter(
+        Donor.latitude.between(south, north),
+        Donor.longitude.between(west, east)
+    )
+    
+    blood_group = request.args.get('blood_group')
+    if blood_group:
+        query = query.filter_by(blood_group=blood_group)
+    
+    # Exact distance check only for the donors inside the box
+    candidates = (
+        (haversine_km(lat, lon, donor.latitude, donor.longitude), donor.id, donor)
+        for donor in query
+    )
+    nearest = heapq.nsmallest(
+        limit,
+        (c for c in candidates if c[0] <= radius_km),
+        key=lambda c: (c[0], c[1])
+    )
+    
+    donors = []
+    for distance, _, donor in nearest:
+        donor_dict = donor.to_dict()
+        donor_dict['distance_km'] = round(distance, 2)
+        donors.append(donor_dict)
     
     return jsonify({
-        'donors': [donor.to_dict() for donor in donors],
+        'center': {'latitude': lat, 'longitude': lon},
+        'radius_km': radius_km,
+        'donors': donors,
         'count': len(donors)
     }), 200
 
 
+@donor_bp.route('/availability', methods=['GET'])
+def get_availability_summary():
+    """Available donor counts per district and blood group"""
+    district = request.args.get('district')
+    return jsonify({'availability': availability.summary(district)}), 200
+
+
 @donor_bp.route('/my-profile', methods=['GET'])
 @token_required
 def get_my_donor_profile(current_user):
@@ -138,18 +321,41 @@ def get_my_donor_profile(current_user):
 @donor_bp.route('/deactivate', methods=['POST'])
 @token_required
 def deactivate_donor(current_user):
-    donor = Donor.query.filter_by(user_id=current_user.id).first()
-    
-    if not donor:
-        return jsonify({'message': 'Donor profile not found'}), 404
-    
-    donor.is_available = False
+    # Conditional update: only an available donor transitions
+    stmt = (
+        update(Donor)
+        .where(Donor.user_id == current_user.id, Donor.is_available == True)
+        .values(is_available=False)
+    )
+    returning = db.session.get_bind().dialect.update_returning
+    if returning:
+        stmt = stmt.returning(Donor.district, Donor.blood_group, Donor.geohash)
     try:
+        result = db.session.execute(stmt)
+        donor = result.first() if returning else None
+        deactivated = donor is not None if returning else bool(result.rowcount)
+        if deactivated:
+            bump_version('donors')
+            adjust_counters(available_donors=-1)
+            if donor is None:
+                # No RETURNING (MySQL): read back the row this transaction just wrote
+                donor = db.session.query(
+                    Donor.district, Donor.blood_group, Donor.geohash
+                ).filter_by(user_id=current_user.id).one()
         db.session.commit()
-        return jsonify({'message': 'Donor profile deactivated successfully'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Deactivation failed: {str(e)}'}), 500
+    
+    if not deactivated:
+        if not db.session.query(Donor.id).filter_by(user_id=current_user.id).first():
+            return jsonify({'message': 'Donor profile not found'}), 404
+        return jsonify({'message': 'Donor profile deactivated successfully'}), 200
+    
+    tile_cache.invalidate(donor.geohash)
+    availability.donor_changed((donor.district, donor.blood_group, True), None)
+    
+    return jsonify({'message': 'Donor profile deactivated successfully'}), 200
 
 
 @donor_bp.route('/<int:donor_id>', methods=['GET'])
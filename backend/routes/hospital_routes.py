@@ -1,7 +1,7 @@
-from flask import Blueprint, request, jsonify
-from models import db, Hospital
-import json
-import os
+from flask import Blueprint, request, jsonify, redirect, url_for
+from config import Config
+from services.hospital_catalog import hospital_catalog
+from utils.fastjson import json_response, precompute, precomputed_response
 
 hospital_bp = Blueprint('hospital', __name__)
 
@@ -16,81 +16,80 @@ TN_DISTRICTS = [
     "Viluppuram", "Virudhunagar"
 ]
 
+_DISTRICTS_BODY = precompute({'districts': TN_DISTRICTS})
+
+IMMUTABLE = f'public, max-age={Config.HOSPITAL_CATALOG_IMMUTABLE_MAX_AGE}, immutable'
+
 
 @hospital_bp.route('/districts', methods=['GET'])
 def get_districts():
     """Get all Tamil Nadu districts"""
-    return jsonify({'districts': TN_DISTRICTS}), 200
+    return precomputed_response(*_DISTRICTS_BODY, cache_control=f'public, max-age={Config.DISTRICTS_MAX_AGE}')
+
+
+@hospital_bp.route('/search', methods=['GET'])
+def search_hospitals():
+    """Search hospitals by name prefix across districts (autocomplete)"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'message': 'Query parameter q is required'}), 400
+    limit = request.args.get('limit', Config.HOSPITAL_SEARCH_LIMIT, type=int)
+    limit = max(1, min(limit, Config.HOSPITAL_SEARCH_MAX_LIMIT))
+    district = request.args.get('district')
+    
+    predicate = (lambda h: h['district'] == district) if district else None
+    results = hospital_catalog.snapshot().search_index.search(query, limit, predicate)
+    
+    return json_response({
+        'query': query,
+        'hospitals': results,
+        'count': len(results)
+    })
 
 
 @hospital_bp.route('/<district>', methods=['GET'])
 def get_hospitals_by_district(district):
     """Get hospitals for a specific district"""
-    # Try to load from JSON file first
-    json_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'hospitals.json')
-    
-    hospitals_list = []
-    
-    # Check if JSON file exists
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                hospitals_data = json.load(f)
-                if district in hospitals_data:
-                    hospitals_list = [
-                        {'name': name, 'district': district}
-                        for name in hospitals_data[district]
-                    ]
-        except Exception as e:
-            print(f"Error reading hospitals.json: {str(e)}")
-    
-    # Also check database
-    db_hospitals = Hospital.query.filter_by(district=district).all()
-    hospitals_list.extend([h.to_dict() for h in db_hospitals])
-    
-    # Remove duplicates
-    seen = set()
-    unique_hospitals = []
-    for h in hospitals_list:
-        name = h['name']
-        if name not in seen:
-            seen.add(name)
-            unique_hospitals.append(h)
-    
-    return jsonify({
-        'district': district,
-        'hospitals': unique_hospitals,
-        'count': len(unique_hospitals)
-    }), 200
+    return precomputed_response(*hospital_catalog.snapshot().district_body(district))
 
 
 @hospital_bp.route('/all', methods=['GET'])
 def get_all_hospitals():
     """Get all hospitals"""
-    hospitals = Hospital.query.all()
-    
-    # Also load from JSON
-    json_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'hospitals.json')
-    json_hospitals = {}
-    
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                json_hospitals = json.load(f)
-        except Exception:
-            pass
-    
-    # Combine results
-    result = {h.to_dict()['district']: [] for h in hospitals}
-    for h in hospitals:
-        result[h.district].append(h.to_dict())
-    
-    # Add JSON hospitals
-    for district, names in json_hospitals.items():
-        if district not in result:
-            result[district] = []
-        for name in names:
-            result[district].append({'name': name, 'district': district})
-    
-    return jsonify({'hospitals': result}), 200
+    return precomputed_response(*hospital_catalog.snapshot().all_body)
+
+
+@hospital_bp.route('/catalog', methods=['GET'])
+def get_catalog_version():
+    """Current catalog version and its cacheable URLs"""
+    version = hospital_catalog.snapshot().version
+    return jsonify({
+        'version': version,
+        'all': url_for('hospital.get_versioned_all', version=version),
+        'district': url_for('hospital.get_versioned_district', version=version, district='DISTRICT')
+    }), 200
+
+
+@hospital_bp.route('/v/<version>/all', methods=['GET'])
+def get_versioned_all(version):
+    """All hospitals of one catalog version; cacheable forever"""
+    snapshot = hospital_catalog.snapshot()
+    if version != snapshot.version:
+        return _redirect_to_current('hospital.get_versioned_all', snapshot.version)
+    return precomputed_response(*snapshot.all_body, cache_control=IMMUTABLE)
+
+
+@hospital_bp.route('/v/<version>/<district>', methods=['GET'])
+def get_versioned_district(version, district):
+    """Hospitals of a district in one catalog version; cacheable forever"""
+    snapshot = hospital_catalog.snapshot()
+    if version != snapshot.version:
+        return _redirect_to_current('hospital.get_versioned_district', snapshot.version, district=district)
+    return precomputed_response(*snapshot.district_body(district), cache_control=IMMUTABLE)
+
 
+def _redirect_to_current(endpoint, version, **values):
+    """Old catalog versions are not kept; send the client to the current one"""
+    response = redirect(url_for(endpoint, version=version, **values))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
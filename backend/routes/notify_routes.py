@@ -1,39 +1,15 @@
 from flask import Blueprint, request, jsonify
-from models import db, Donor, Request
+from models import db, Donor, Request, NotificationJob
 from routes.auth_routes import token_required
 from config import Config
-import os
+from services.matching import widening_matches
+from services.dispatch import dispatcher
+from services.outbox import enqueue, job_progress, backlog, wake_workers
+from services.sms import send_sms, sms_limiter
+from utils.params import parse_bool
 
 notify_bp = Blueprint('notify', __name__)
 
-# Initialize Twilio client if credentials are available
-try:
-    from twilio.rest import Client
-    twilio_client = None
-    if Config.TWILIO_ACCOUNT_SID and Config.TWILIO_AUTH_TOKEN:
-        twilio_client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
-except ImportError:
-    twilio_client = None
-    print("Twilio not installed. SMS notifications will be disabled.")
-
-
-def send_sms(to_phone, message):
-    """Send SMS via Twilio"""
-    if not twilio_client or not Config.TWILIO_PHONE_NUMBER:
-        print(f"[SMS Mock] To: {to_phone}, Message: {message}")
-        return {'success': False, 'message': 'SMS service not configured'}
-    
-    try:
-        message_obj = twilio_client.messages.create(
-            body=message,
-            from_=Config.TWILIO_PHONE_NUMBER,
-            to=to_phone
-        )
-        return {'success': True, 'sid': message_obj.sid}
-    except Exception as e:
-        print(f"SMS sending failed: {str(e)}")
-        return {'success': False, 'message': str(e)}
-
 
 @notify_bp.route('/request-donors', methods=['POST'])
 @token_required
@@ -49,17 +25,35 @@ def notify_donors_for_request(current_user):
     if not blood_request:
         return jsonify({'message': 'Request not found'}), 404
     
-    # Find matching donors
-    matching_donors = Donor.query.filter_by(
-        blood_group=blood_request.blood_group,
-        district=blood_request.district,
-        is_available=True
-    ).all()
+    try:
+        target = int(data.get('target', Config.MATCH_TARGET_DONORS))
+    except (TypeError, ValueError):
+        return jsonify({'message': 'target must be an integer'}), 400
+    try:
+        compatible = parse_bool(data.get('compatible'), False, 'compatible')
+        exact_first = parse_bool(data.get('exact_first'), False, 'exact_first')
+        widen = parse_bool(data.get('widen'), True, 'widen')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    # Find matching donors (compatible also matches ABO/Rh-compatible groups),
+    # widening to neighbouring districts until `target` donors match
+    found, rings = widening_matches(
+        blood_request.blood_group,
+        blood_request.district,
+        target,
+        compatible=compatible,
+        exact_first=exact_first,
+        max_ring=None if widen else 0,
+        columns=(Donor.id, Donor.phone, Donor.district, Donor.blood_group)
+    )
+    recipients = [(donor.id, donor.phone) for _, donor in found]
     
-    if not matching_donors:
+    if not recipients:
         return jsonify({
             'message': 'No matching donors found',
-            'notifications_sent': 0
+            'notifications_sent': 0,
+            'rings': rings
         }), 200
     
     # Prepare notification message
@@ -76,26 +70,55 @@ def notify_donors_for_request(current_user):
         f"From BloodLink TN"
     )
     
-    # Send notifications
-    notifications = []
-    success_count = 0
-    
-    for donor in matching_donors:
-        result = send_sms(donor.phone, message)
-        notifications.append({
-            'donor_id': donor.id,
-            'donor_name': donor.name,
-            'phone': donor.phone,
-            'success': result['success']
-        })
-        if result['success']:
-            success_count += 1
+    # Queue every SMS in the outbox; the outbox workers send them with retries
+    job = NotificationJob(
+        request_id=blood_request.id,
+        user_id=current_user.id,
+        urgency=blood_request.urgency,
+        total=len(recipients)
+    )
     
+    try:
+        db.session.add(job)
+        db.session.flush()
+        enqueue(job, message, recipients)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Failed to queue notifications: {str(e)}'}), 500
+    
+    wake_workers()
+    
+    return jsonify({
+        'message': f'Notifications queued for {len(recipients)} donors',
+        'job_id': job.id,
+        'job': job.to_dict(),
+        'total_donors': len(recipients),
+        'rings': rings
+    }), 202
+
+
+@notify_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@token_required
+def get_notification_job(current_user, job_id):
+    """Delivery progress of a notification job"""
+    job = NotificationJob.query.get(job_id)
+    if not job:
+        return jsonify({'message': 'Job not found'}), 404
+    
+    return jsonify({
+        'job': job.to_dict(),
+        'progress': job_progress(job.id)
+    }), 200
+
+
+@notify_bp.route('/queues', methods=['GET'])
+def get_dispatch_queues():
+    """Queue depth and wait times per urgency class, outbox backlog and SMS rate limit"""
     return jsonify({
-        'message': f'Notifications sent to {success_count} out of {len(matching_donors)} donors',
-        'notifications': notifications,
-        'notifications_sent': success_count,
-        'total_donors': len(matching_donors)
+        'queues': dispatcher.stats(),
+        'outbox': backlog(),
+        'rate_limit': sms_limiter.stats()
     }), 200
 
 
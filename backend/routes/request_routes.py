@@ -1,10 +1,23 @@
 from flask import Blueprint, request, jsonify
-from models import db, Request, Donor
+from sqlalchemy import insert, update
+from models import db, Request, REQUEST_COLUMNS, DONOR_COLUMNS
 from routes.auth_routes import token_required
+from utils.pagination import get_page_args, keyset_page
+from utils.fastjson import json_response, rows_to_dicts
+from utils.params import parse_bool
+from services.matching import matching_counts, widening_matches
+from services.ranking import rank_donors
+from services.availability import availability
+from services.dashboard import adjust_counters
+from services.versions import bump_version, conditional_get
+from config import Config
 from datetime import datetime
 
 request_bp = Blueprint('request', __name__)
 
+REQUIRED_REQUEST_FIELDS = ['requester_name', 'blood_group', 'district', 'hospital', 'phone']
+URGENCY_LEVELS = ('normal', 'urgent', 'critical')
+
 
 @request_bp.route('/create', methods=['POST'])
 @token_required
@@ -12,8 +25,7 @@ def create_request(current_user):
     data = request.get_json()
     
     # Validate required fields
-    required_fields = ['requester_name', 'blood_group', 'district', 'hospital', 'phone']
-    for field in required_fields:
+    for field in REQUIRED_REQUEST_FIELDS:
         if field not in data:
             return jsonify({'message': f'{field} is required'}), 400
     
@@ -30,26 +42,128 @@ def create_request(current_user):
     
     try:
         db.session.add(blood_request)
+        bump_version('requests')
+        adjust_counters(total_requests=1)
         db.session.commit()
         
-        # Find matching donors
-        matching_donors = Donor.query.filter_by(
-            blood_group=blood_request.blood_group,
-            district=blood_request.district,
-            is_available=True
-        ).all()
-        
         return jsonify({
             'message': 'Blood request created successfully',
             'request': blood_request.to_dict(),
-            'matching_donors_count': len(matching_donors)
+            'matching_donors_count': availability.count(blood_request.district, blood_request.blood_group)
         }), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Request creation failed: {str(e)}'}), 500
 
 
+def _insert_returning_ids(rows):
+    """Insert request rows in one statement; returns their new ids in input order"""
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = db.session.execute(
+            insert(Request.__table__).returning(Request.id, sort_by_parameter_order=True), rows
+        )
+        return [request_id for (request_id,) in result]
+    
+    # MySQL has no RETURNING: a multi-row INSERT allocates consecutive ids
+    # (auto_increment_increment = 1) and lastrowid is the first of them
+    result = db.session.execute(insert(Request.__table__).values(rows))
+    first_id = result.lastrowid
+    return list(range(first_id, first_id + len(rows)))
+
+
+@request_bp.route('/bulk', methods=['POST'])
+@token_required
+def create_requests_bulk(current_user):
+    """
+    Create many blood requests in one transaction.
+    
+    Valid items are inserted with a single multi-row INSERT and their match
+    counts come from one grouped query. Invalid items are reported by index
+    and do not stop the rest of the batch.
+    """
+    data = request.get_json() or {}
+    items = data.get('requests')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'message': 'requests must be a non-empty list'}), 400
+    if len(items) > Config.MAX_BULK_REQUESTS:
+        return jsonify({'message': f'At most {Config.MAX_BULK_REQUESTS} requests per batch'}), 400
+    
+    # Validate each item; keep the index so results line up with the input
+    results = [None] * len(items)
+    rows = []
+    row_indexes = []
+    batch_created_at = datetime.utcnow()
+    
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = {'index': i, 'success': False, 'message': 'Request must be an object'}
+            continue
+        
+        missing = [field for field in REQUIRED_REQUEST_FIELDS if not item.get(field)]
+        if missing:
+            results[i] = {'index': i, 'success': False, 'message': f'{missing[0]} is required'}
+            continue
+        
+        urgency = item.get('urgency', 'normal')
+        if urgency not in URGENCY_LEVELS:
+            results[i] = {'index': i, 'success': False, 'message': f'urgency must be one of {", ".join(URGENCY_LEVELS)}'}
+            continue
+        
+        rows.append({
+            'user_id': current_user.id,
+            'requester_name': item['requester_name'],
+            'blood_group': item['blood_group'],
+            'district': item['district'],
+            'hospital': item['hospital'],
+            'phone': item['phone'],
+            'urgency': urgency,
+            'status': 'pending',
+            'created_at': batch_created_at,
+            'fulfilled_at': None
+        })
+        row_indexes.append(i)
+    
+    if rows:
+        try:
+            ids = _insert_returning_ids(rows)
+            bump_version('requests')
+            adjust_counters(total_requests=len(rows))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'message': f'Bulk request creation failed: {str(e)}'}), 500
+        
+        counts = matching_counts((row['district'], row['blood_group']) for row in rows)
+        
+        for i, request_id, row in zip(row_indexes, ids, rows):
+            created_request = dict(id=request_id, **row)
+            results[i] = {
+                'index': i,
+                'success': True,
+                'request': created_request,
+                'matching_donors_count': counts[(created_request['district'], created_request['blood_group'])]
+            }
+    
+    failed = len(items) - len(rows)
+    if not rows:
+        status = 400
+    elif failed:
+        status = 207
+    else:
+        status = 201
+    
+    return json_response({
+        'message': f'Created {len(rows)} of {len(items)} requests',
+        'created': len(rows),
+        'failed': failed,
+        'results': results
+    }, status)
+
+
 @request_bp.route('/all', methods=['GET'])
+@conditional_get('requests')
 def get_all_requests():
     """Get all blood requests"""
     status = request.args.get('status')
@@ -67,42 +181,76 @@ def get_all_requests():
     if blood_group:
         query = query.filter_by(blood_group=blood_group)
     
-    requests = query.order_by(Request.created_at.desc()).all()
+    try:
+        page = get_page_args()
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
     
-    return jsonify({
-        'requests': [req.to_dict() for req in requests],
-        'count': len(requests)
-    }), 200
+    # Plain rows of the to_dict() columns, no ORM objects
+    query = query.with_entities(*REQUEST_COLUMNS)
+    
+    if page is None:
+        requests = query.order_by(Request.created_at.desc()).all()
+        return json_response({
+            'requests': rows_to_dicts(requests),
+            'count': len(requests)
+        })
+    
+    requests, next_cursor, count = keyset_page(query, Request.created_at, Request.id, **page)
+    
+    return json_response({
+        'requests': rows_to_dicts(requests),
+        'count': count,
+        'next_cursor': next_cursor
+    })
 
 
 @request_bp.route('/my-requests', methods=['GET'])
 @token_required
 def get_my_requests(current_user):
-    requests = Request.query.filter_by(user_id=current_user.id).order_by(Request.created_at.desc()).all()
+    requests = Request.query.filter_by(user_id=current_user.id).with_entities(
+        *REQUEST_COLUMNS
+    ).order_by(Request.created_at.desc()).all()
     
-    return jsonify({
-        'requests': [req.to_dict() for req in requests],
+    return json_response({
+        'requests': rows_to_dicts(requests),
         'count': len(requests)
-    }), 200
+    })
 
 
 @request_bp.route('/<int:request_id>/fulfill', methods=['POST'])
 @token_required
 def fulfill_request(current_user, request_id):
-    blood_request = Request.query.get_or_404(request_id)
-    
-    if blood_request.status == 'fulfilled':
-        return jsonify({'message': 'Request already fulfilled'}), 400
-    
-    blood_request.status = 'fulfilled'
-    blood_request.fulfilled_at = datetime.utcnow()
-    
+    # Conditional update: of two concurrent fulfills, only one matches a row
+    stmt = (
+        update(Request)
+        .where(Request.id == request_id, Request.status != 'fulfilled')
+        .values(status='fulfilled', fulfilled_at=datetime.utcnow())
+    )
+    returning = db.session.get_bind().dialect.update_returning
+    if returning:
+        stmt = stmt.returning(*REQUEST_COLUMNS)
     try:
+        result = db.session.execute(stmt)
+        row = result.first() if returning else None
+        fulfilled = row is not None if returning else bool(result.rowcount)
+        if fulfilled:
+            bump_version('requests')
+            adjust_counters(fulfilled_requests=1)
+            if row is None:
+                # No RETURNING (MySQL): read back the row this transaction just wrote
+                row = db.session.query(*REQUEST_COLUMNS).filter(Request.id == request_id).one()
         db.session.commit()
-        return jsonify({'message': 'Request marked as fulfilled', 'request': blood_request.to_dict()}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Update failed: {str(e)}'}), 500
+    
+    if not fulfilled:
+        if not db.session.query(Request.id).filter_by(id=request_id).first():
+            return jsonify({'message': 'Request not found'}), 404
+        return jsonify({'message': 'Request already fulfilled'}), 400
+    
+    return jsonify({'message': 'Request marked as fulfilled', 'request': Request(**row._mapping).to_dict()}), 200
 
 
 @request_bp.route('/<int:request_id>', methods=['GET'])
@@ -112,19 +260,78 @@ def get_request(request_id):
 
 
 @request_bp.route('/<int:request_id>/match-donors', methods=['GET'])
+@conditional_get('donors', 'requests')
 def get_matching_donors(request_id):
     """Get matching donors for a specific request"""
     blood_request = Request.query.get_or_404(request_id)
     
-    matching_donors = Donor.query.filter_by(
-        blood_group=blood_request.blood_group,
-        district=blood_request.district,
-        is_available=True
-    ).all()
+    # compatible=true also matches ABO/Rh-compatible groups (e.g. O- for AB+).
+    # Too few donors in the district widens the search to neighbouring
+    # districts, ring by ring, until `target` donors match (widen=false: district only)
+    try:
+        compatible = parse_bool(request.args.get('compatible'), False, 'compatible')
+        exact_first = parse_bool(request.args.get('exact_first'), False, 'exact_first')
+        widen = parse_bool(request.args.get('widen'), True, 'widen')
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    try:
+        target = int(request.args.get('target', Config.MATCH_TARGET_DONORS))
+    except ValueError:
+        return jsonify({'message': 'target must be an integer'}), 400
+    
+    # top=k returns the k best-scoring donors, best first
+    top = request.args.get('top')
+    if top is not None:
+        try:
+            top = int(top)
+        except ValueError:
+            return jsonify({'message': 'top must be an integer'}), 400
+        if top < 1:
+            return jsonify({'message': 'top must be positive'}), 400
+        top = min(top, Config.MAX_PAGE_SIZE)
+        
+        found, rings = widening_matches(
+            blood_request.blood_group,
+            blood_request.district,
+            max(target, top),
+            compatible=compatible,
+            max_ring=None if widen else 0,
+            columns=DONOR_COLUMNS
+        )
+        ring_of = {donor.id: ring for ring, donor in found}
+        donors = rank_donors(blood_request, [donor for _, donor in found], top)
+        for donor in donors:
+            donor['exact_match'] = donor['blood_group'] == blood_request.blood_group
+            donor['ring'] = ring_of[donor['id']]
+        
+        return json_response({
+            'request': blood_request.to_dict(),
+            'matching_donors': donors,
+            'count': len(donors),
+            'rings': rings,
+            'ranked': True
+        })
+    
+    found, rings = widening_matches(
+        blood_request.blood_group,
+        blood_request.district,
+        target,
+        compatible=compatible,
+        exact_first=exact_first,
+        max_ring=None if widen else 0
+    )
+    
+    donors = []
+    for ring, donor in found:
+        donor_dict = donor.to_dict()
+        donor_dict['exact_match'] = donor.blood_group == blood_request.blood_group
+        donor_dict['ring'] = ring
+        donors.append(donor_dict)
     
     return jsonify({
         'request': blood_request.to_dict(),
-        'matching_donors': [donor.to_dict() for donor in matching_donors],
-        'count': len(matching_donors)
+        'matching_donors': donors,
+        'count': len(donors),
+        'rings': rings
     }), 200
 
@@ -0,0 +1,226 @@
+"""
+Request analytics served from pre-aggregated rollups.
+
+run_rollups() folds new activity on the requests table into
+`request_rollups`, one row per (hour or day, district, blood group):
+- requests created since the `requests.created_at` watermark add to
+  created_count of the bucket they were created in
+- requests fulfilled since the `requests.fulfilled_at` watermark add to
+  fulfilled_count of that same creation bucket, and their
+  fulfilled_at - created_at latency to its QuantileSketch
+
+so each run reads only rows newer than the last one. Runs stop
+Config.ANALYTICS_LAG_SECONDS short of now, leaving time for transactions
+that stamped a timestamp but had not committed yet. The watermark rows are
+locked for the whole run, so concurrent runs (one scheduler per worker
+process) queue up instead of counting rows twice.
+
+Reads sum the counters in SQL and merge sketches in Python, so any range
+of buckets can be combined and still answer percentiles.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from config import Config
+from models import db, Request, RequestRollup, RollupWatermark
+from utils.sketch import QuantileSketch
+from utils.upsert import upsert
+
+GRANULARITIES = ('hour', 'day')
+CREATED_WATERMARK = 'requests.created_at'
+FULFILLED_WATERMARK = 'requests.fulfilled_at'
+EPOCH = datetime(1970, 1, 1)
+
+ROLLUP_KEY = ['granularity', 'bucket_start', 'district', 'blood_group']
+ROLLUP_VALUES = ['created_count', 'fulfilled_count', 'latency_sketch']
+
+# Rows per streamed read and per upsert statement
+BATCH_SIZE = 5000
+
+
+def bucket_start(ts, granularity):
+    """Start of the hour or day containing ts"""
+    if granularity == 'hour':
+        return ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_watermarks(lock=False):
+    """{watermark name: datetime}; with lock, the rows stay locked until commit"""
+    stmt = select(RollupWatermark).where(RollupWatermark.name.in_((CREATED_WATERMARK, FULFILLED_WATERMARK)))
+    if lock:
+        stmt = stmt.with_for_update()
+    watermarks = dict.fromkeys((CREATED_WATERMARK, FULFILLED_WATERMARK), EPOCH)
+    watermarks.update({row.name: row.value for row in db.session.execute(stmt).scalars()})
+    return watermarks
+
+
+def run_rollups(now=None):
+    """
+    Fold requests created or fulfilled since the last run into the rollups.
+    Returns {'created', 'fulfilled', 'buckets', 'watermark'}. The caller commits.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=Config.ANALYTICS_LAG_SECONDS)
+    watermarks = get_watermarks(lock=True)
+
+    # (granularity, bucket_start, district, blood_group) -> [created, fulfilled, sketch]
+    deltas = {}
+
+    def bucket(created_at, district, blood_group, granularity):
+        key = (granularity, bucket_start(created_at, granularity), district, blood_group)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = [0, 0, None]
+        return delta
+
+    created = 0
+    if watermarks[CREATED_WATERMARK] < cutoff:
+        rows = db.session.query(
+            Request.created_at, Request.district, Request.blood_group
+        ).filter(
+            Request.created_at > watermarks[CREATED_WATERMARK],
+            Request.created_at <= cutoff
+        ).yield_per(BATCH_SIZE)
+        for created_at, district, blood_group in rows:
+            for granularity in GRANULARITIES:
+                bucket(created_at, district, blood_group, granularity)[0] += 1
+            created += 1
+
+    fulfilled = 0
+    if watermarks[FULFILLED_WATERMARK] < cutoff:
+        rows = db.session.query(
+            Request.created_at, Request.fulfilled_at, Request.district, Request.blood_group
+        ).filter(
+            Request.status == 'fulfilled',
+            Request.fulfilled_at > watermarks[FULFILLED_WATERMARK],
+            Request.fulfilled_at <= cutoff
+        ).yield_per(BATCH_SIZE)
+        for created_at, fulfilled_at, district, blood_group in rows:
+            latency = (fulfilled_at - created_at).total_seconds()
+            for granularity in GRANULARITIES:
+                delta = bucket(created_at, district, blood_group, granularity)
+                delta[1] += 1
+                if delta[2] is None:
+                    delta[2] = QuantileSketch()
+                delta[2].add(latency)
+            fulfilled += 1
+
+    if deltas:
+        _merge_deltas(deltas)
+
+    upsert(RollupWatermark, [
+        {'name': CREATED_WATERMARK, 'value': max(cutoff, watermarks[CREATED_WATERMARK])},
+        {'name': FULFILLED_WATERMARK, 'value': max(cutoff, watermarks[FULFILLED_WATERMARK])}
+    ], ['name'], ['value'])
+
+    return {'created': created, 'fulfilled': fulfilled, 'buckets': len(deltas), 'watermark': cutoff}
+
+
+def _merge_deltas(deltas):
+    """Add deltas to the stored rollup rows, inserting the missing ones"""
+    values = []
+    for granularity in GRANULARITIES:
+        keys = {key for key in deltas if key[0] == granularity}
+        if not keys:
+            continue
+        starts = sorted({key[1] for key in keys})
+        existing = {}
+        for i in range(0, len(starts), BATCH_SIZE):
+            rows = db.session.query(
+                RequestRollup.bucket_start, RequestRollup.district, RequestRollup.blood_group,
+                RequestRollup.created_count, RequestRollup.fulfilled_count, RequestRollup.latency_sketch
+            ).filter(
+                RequestRollup.granularity == granularity,
+                RequestRollup.bucket_start.in_(starts[i:i + BATCH_SIZE])
+            )
+            for row in rows:
+                existing[(granularity, row.bucket_start, row.district, row.blood_group)] = row
+
+        for key in keys:
+            created, fulfilled, sketch = deltas[key]
+            row = existing.get(key)
+            if row is not None:
+                created += row.created_count
+                fulfilled += row.fulfilled_count
+                if row.latency_sketch:
+                    stored = QuantileSketch.from_json(row.latency_sketch)
+                    sketch = stored.merge(sketch) if sketch is not None else stored
+            values.append({
+                'granularity': key[0], 'bucket_start': key[1], 'district': key[2], 'blood_group': key[3],
+                'created_count': created, 'fulfilled_count': fulfilled,
+                'latency_sketch': sketch.to_json() if sketch is not None else None
+            })
+
+    for i in range(0, len(values), BATCH_SIZE):
+        upsert(RequestRollup, values[i:i + BATCH_SIZE], ROLLUP_KEY, ROLLUP_VALUES)
+
+
+def _rollup_filter(query, granularity, start, end, district=None):
+    query = query.filter(
+        RequestRollup.granularity == granularity,
+        RequestRollup.bucket_start >= bucket_start(start, granularity),
+        RequestRollup.bucket_start < end
+    )
+    if district:
+        query = query.filter(RequestRollup.district == district)
+    return query
+
+
+def request_series(granularity, start, end, district=None):
+    """Requests created and fulfilled per bucket and district"""
+    rows = _rollup_filter(db.session.query(
+        RequestRollup.bucket_start, RequestRollup.district,
+        func.sum(RequestRollup.created_count), func.sum(RequestRollup.fulfilled_count)
+    ), granularity, start, end, district).group_by(
+        RequestRollup.bucket_start, RequestRollup.district
+    ).order_by(RequestRollup.bucket_start, RequestRollup.district).all()
+
+    return [
+        {'bucket': bucket, 'district': d, 'created': int(created), 'fulfilled': int(fulfilled)}
+        for bucket, d, created, fulfilled in rows
+    ]
+
+
+def fulfillment_rates(granularity, start, end, by='district', district=None):
+    """Created, fulfilled and fulfilled/created per district or blood group"""
+    column = RequestRollup.blood_group if by == 'blood_group' else RequestRollup.district
+    rows = _rollup_filter(db.session.query(
+        column, func.sum(RequestRollup.created_count), func.sum(RequestRollup.fulfilled_count)
+    ), granularity, start, end, district).group_by(column).order_by(column).all()
+
+    return [
+        {by: key, 'created': int(created), 'fulfilled': int(fulfilled),
+         'rate': round(int(fulfilled) / int(created), 4) if created else None}
+        for key, created, fulfilled in rows
+    ]
+
+
+def latency_percentiles(granularity, start, end, quantiles, district=None):
+    """
+    {blood_group: {'count', 'p50', ...}} of fulfillment latency in seconds,
+    plus an 'all' entry, merged from the sketches of every bucket in range
+    """
+    rows = _rollup_filter(db.session.query(
+        RequestRollup.blood_group, RequestRollup.latency_sketch
+    ), granularity, start, end, district).filter(RequestRollup.latency_sketch.isnot(None))
+
+    sketches = {}
+    total = QuantileSketch()
+    for blood_group, text in rows:
+        sketch = QuantileSketch.from_json(text)
+        total.merge(sketch)
+        if blood_group in sketches:
+            sketches[blood_group].merge(sketch)
+        else:
+            sketches[blood_group] = sketch
+    sketches['all'] = total
+
+    def summary(sketch):
+        result = {'count': sketch.count}
+        for q in quantiles:
+            value = sketch.quantile(q)
+            result[f'p{q * 100:g}'] = round(value, 1) if value is not None else None
+        return result
+
+    return {blood_group: summary(sketch) for blood_group, sketch in sorted(sketches.items())}
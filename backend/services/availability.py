@@ -0,0 +1,91 @@
+"""
+In-memory count of available donors per (district, blood_group).
+
+The index is loaded with one grouped COUNT on first use and then adjusted
+by the donor write paths (register, deactivate, expiry), so "how many
+donors match" is a dict lookup instead of materializing donor rows.
+
+Each worker process keeps its own index. Writes handled by other workers
+are picked up by reconcile(), which the scheduler runs every
+Config.AVAILABILITY_RECONCILE_MINUTES and which also repairs any drift.
+"""
+import threading
+
+from sqlalchemy import func
+
+from models import db, Donor
+
+
+def donor_key(donor):
+    """(district, blood_group, is_available) snapshot of a donor, or None"""
+    if donor is None:
+        return None
+    return donor.district, donor.blood_group, bool(donor.is_available)
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self._counts = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def reconcile(self):
+        """Reload every counter from the database; returns the number of keys that drifted"""
+        rows = db.session.query(
+            Donor.district, Donor.blood_group, func.count(Donor.id)
+        ).filter(
+            Donor.is_available == True
+        ).group_by(Donor.district, Donor.blood_group).all()
+
+        counts = {(district, blood_group): count for district, blood_group, count in rows}
+        with self._lock:
+            drifted = 0
+            if self._loaded:
+                keys = set(counts) | set(self._counts)
+                drifted = sum(1 for k in keys if counts.get(k, 0) != self._counts.get(k, 0))
+            self._counts = counts
+            self._loaded = True
+        return drifted
+
+    def mark_stale(self):
+        """Reload on next use, for a change whose previous key is unknown"""
+        with self._lock:
+            self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reconcile()
+
+    def count(self, district, blood_groups):
+        """Available donors in a district for one blood group or an iterable of groups"""
+        self._ensure_loaded()
+        if isinstance(blood_groups, str):
+            blood_groups = (blood_groups,)
+        with self._lock:
+            return sum(self._counts.get((district, bg), 0) for bg in blood_groups)
+
+    def summary(self, district=None):
+        """{district: {blood_group: count}}, optionally for a single district"""
+        self._ensure_loaded()
+        result = {}
+        with self._lock:
+            for (d, bg), count in self._counts.items():
+                if count and (district is None or d == district):
+                    result.setdefault(d, {})[bg] = count
+        return result
+
+    def donor_changed(self, before, after):
+        """
+        Apply a committed donor change. `before` and `after` are donor_key()
+        snapshots; either may be None for an insert or delete.
+        """
+        if not self._loaded:
+            return
+        with self._lock:
+            for key, delta in ((before, -1), (after, 1)):
+                if key and key[2]:
+                    counter = key[:2]
+                    self._counts[counter] = max(self._counts.get(counter, 0) + delta, 0)
+
+
+availability = AvailabilityIndex()
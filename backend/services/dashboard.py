@@ -0,0 +1,76 @@
+"""
+Materialized dashboard totals.
+
+The `dashboard_counters` table holds a single row (id=1) with the donor
+and request totals shown on the dashboard. Every write path that changes
+one of them calls adjust_counters() inside its own transaction, so the
+row commits or rolls back together with the change, and the dashboard
+endpoint is one primary-key read instead of four COUNTs.
+
+reconcile_counters() recomputes the row from the tables; the scheduler
+runs it every Config.DASHBOARD_RECONCILE_MINUTES to correct any drift
+(e.g. from writes made outside the app).
+"""
+from sqlalchemy import case, func, select, update
+
+from models import db, DashboardCounters, Donor, Request
+from utils.upsert import upsert
+
+COUNTER_COLUMNS = ['total_donors', 'available_donors', 'total_requests', 'fulfilled_requests']
+
+
+def count_totals():
+    """The dashboard totals counted from the donors and requests tables"""
+    total_donors, available_donors = db.session.query(
+        func.count(Donor.id), func.count(case((Donor.is_available == True, 1)))
+    ).one()
+    total_requests, fulfilled_requests = db.session.query(
+        func.count(Request.id), func.count(case((Request.status == 'fulfilled', 1)))
+    ).one()
+    return {
+        'total_donors': total_donors,
+        'available_donors': available_donors,
+        'total_requests': total_requests,
+        'fulfilled_requests': fulfilled_requests
+    }
+
+
+def adjust_counters(**deltas):
+    """Add deltas (e.g. total_requests=1) to the counters in the current transaction"""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    result = db.session.execute(
+        update(DashboardCounters)
+        .where(DashboardCounters.id == 1)
+        .values({name: getattr(DashboardCounters, name) + delta for name, delta in deltas.items()})
+    )
+    if not result.rowcount:
+        # No row yet: count it, which already includes this transaction's change
+        upsert(DashboardCounters, dict(id=1, **count_totals()), ['id'], COUNTER_COLUMNS)
+
+
+def reconcile_counters():
+    """
+    Recompute the counters from the tables; returns the names of the
+    counters that had drifted. The caller commits.
+    """
+    # Lock the row first so no adjust_counters() commits between the counts and the write
+    row = db.session.execute(
+        select(DashboardCounters).where(DashboardCounters.id == 1).with_for_update()
+    ).scalar_one_or_none()
+    totals = count_totals()
+    drifted = [name for name in COUNTER_COLUMNS if row is None or getattr(row, name) != totals[name]]
+    if drifted:
+        upsert(DashboardCounters, dict(id=1, **totals), ['id'], COUNTER_COLUMNS)
+    return drifted
+
+
+def read_counters():
+    """The dashboard totals as a dict"""
+    row = db.session.get(DashboardCounters, 1)
+    if row is None:
+        reconcile_counters()
+        db.session.commit()
+        row = db.session.get(DashboardCounters, 1)
+    return row.to_dict()
@@ -0,0 +1,151 @@
+"""
+Urgency-aware dispatch of notification sends.
+
+Sends are queued per urgency class ('critical', 'urgent', 'normal') and
+drained by a small pool of worker threads. Workers pick the next class by
+smooth weighted round robin over the non-empty queues, using
+Config.DISPATCH_WEIGHTS: when a critical fan-out arrives it takes most of
+the send slots immediately, ahead of lower-priority sends already waiting,
+while those still make progress at their weighted share instead of
+starving.
+
+fan_out() runs one send per recipient with at most `parallelism` of them
+in flight, and reports sends that have not finished within their time
+budget as timed out instead of holding the request thread.
+
+Queue depth and per-class wait times are tracked for /api/notify/queues.
+"""
+from collections import deque
+from concurrent.futures import Future, wait
+import math
+import threading
+import time
+
+from config import Config
+
+URGENCY_CLASSES = ('critical', 'urgent', 'normal')
+
+# Recent waits kept per class for the stats endpoint
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PriorityDispatcher:
+    def __init__(self, workers, weights):
+        self.workers = workers
+        self.weights = {c: weights.get(c, 1) for c in URGENCY_CLASSES}
+        self._queues = {c: deque() for c in URGENCY_CLASSES}
+        self._current = dict.fromkeys(URGENCY_CLASSES, 0)
+        self._waits = {c: deque(maxlen=WAIT_SAMPLE_SIZE) for c in URGENCY_CLASSES}
+        self._dispatched = dict.fromkeys(URGENCY_CLASSES, 0)
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'dispatch-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, urgency, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) under an urgency class; returns a Future"""
+        urgency = urgency if urgency in self._queues else 'normal'
+        future = Future()
+        with self._cond:
+            self._ensure_started()
+            self._queues[urgency].append((time.monotonic(), future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def fan_out(self, urgency, fn, items, parallelism, timeout):
+        """
+        Run fn(item) for every item under an urgency class, keeping at most
+        `parallelism` calls in flight. Returns results in item order; a call
+        that raised, or did not finish within `timeout` seconds of its
+        expected slot, is returned as the exception instance.
+        """
+        if not items:
+            return []
+
+        slots = threading.BoundedSemaphore(max(parallelism, 1))
+        # Worst case: every call in every round takes the full timeout
+        deadline = time.monotonic() + timeout * math.ceil(len(items) / max(parallelism, 1))
+
+        futures = []
+        for item in items:
+            if not slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                future = Future()
+                future.set_exception(TimeoutError('Send was not started before the deadline'))
+            else:
+                future = self.submit(urgency, fn, item)
+                future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+
+        wait(futures, timeout=max(deadline - time.monotonic(), 0))
+
+        results = []
+        for future in futures:
+            if not future.done():
+                future.cancel()
+                results.append(TimeoutError(f'Send did not finish within {timeout}s'))
+            elif future.cancelled():
+                results.append(TimeoutError('Send was cancelled'))
+            elif future.exception() is not None:
+                results.append(future.exception())
+            else:
+                results.append(future.result())
+        return results
+
+    def _next(self):
+        """Pop the next job by smooth weighted round robin; caller holds the lock"""
+        ready = [c for c in URGENCY_CLASSES if self._queues[c]]
+        if not ready:
+            return None
+
+        total = 0
+        for c in ready:
+            self._current[c] += self.weights[c]
+            total += self.weights[c]
+        chosen = max(ready, key=lambda c: self._current[c])
+        self._current[chosen] -= total
+
+        enqueued_at, future, fn, args, kwargs = self._queues[chosen].popleft()
+        self._waits[chosen].append(time.monotonic() - enqueued_at)
+        self._dispatched[chosen] += 1
+        return future, fn, args, kwargs
+
+    def _run(self):
+        while True:
+            with self._cond:
+                job = self._next()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next()
+
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self):
+        """Queue depth, dispatched count and wait times (ms) per urgency class"""
+        with self._cond:
+            result = {}
+            for c in URGENCY_CLASSES:
+                waits = sorted(self._waits[c])
+                result[c] = {
+                    'queued': len(self._queues[c]),
+                    'dispatched': self._dispatched[c],
+                    'weight': self.weights[c],
+                    'avg_wait_ms': round(sum(waits) / len(waits) * 1000, 2) if waits else 0,
+                    'p95_wait_ms': round(waits[min(int(len(waits) * 0.95), len(waits) - 1)] * 1000, 2) if waits else 0,
+                    'max_wait_ms': round(waits[-1] * 1000, 2) if waits else 0,
+                }
+            return result
+
+
+dispatcher = PriorityDispatcher(Config.DISPATCH_WORKERS, Config.DISPATCH_WEIGHTS)
@@ -0,0 +1,86 @@
+"""
+District adjacency graph for widening donor searches.
+
+Built once at import from DISTRICT_BORDERS. Each border is weighted with
+an approximate travel distance between the two district headquarters
+(great-circle distance times ROAD_FACTOR). At load time it precomputes,
+for every district:
+- shortest travel distance and path to every other district (Dijkstra)
+- rings: ring 0 is the district itself, ring n the districts n borders
+  away, each ring ordered by travel distance
+
+so a widening search only does dictionary lookups.
+"""
+import heapq
+
+from data.districts_data import DISTRICT_BORDERS, DISTRICT_COORDINATES
+from utils.geo import haversine_km
+
+# Roads are longer than the straight line between headquarters
+ROAD_FACTOR = 1.3
+
+
+class DistrictGraph:
+    def __init__(self, borders, coordinates):
+        self.neighbours = {name: {} for name in coordinates}
+        for a, b in borders:
+            km = round(haversine_km(*coordinates[a], *coordinates[b]) * ROAD_FACTOR, 1)
+            self.neighbours[a][b] = km
+            self.neighbours[b][a] = km
+
+        self._distances = {}
+        self._previous = {}
+        self._rings = {}
+        for name in self.neighbours:
+            self._distances[name], self._previous[name] = self._shortest_paths(name)
+            self._rings[name] = self._build_rings(name)
+
+    def _shortest_paths(self, source):
+        distances = {source: 0.0}
+        previous = {}
+        heap = [(0.0, source)]
+        while heap:
+            km, name = heapq.heappop(heap)
+            if km > distances[name]:
+                continue
+            for neighbour, edge_km in self.neighbours[name].items():
+                candidate = km + edge_km
+                if candidate < distances.get(neighbour, float('inf')):
+                    distances[neighbour] = candidate
+                    previous[neighbour] = name
+                    heapq.heappush(heap, (candidate, neighbour))
+        return distances, previous
+
+    def _build_rings(self, source):
+        distances = self._distances[source]
+        rings = [(source,)]
+        seen = {source}
+        while True:
+            ring = {n for name in rings[-1] for n in self.neighbours[name]} - seen
+            if not ring:
+                return tuple(rings)
+            seen |= ring
+            rings.append(tuple(sorted(ring, key=lambda n: (distances.get(n, float('inf')), n))))
+
+    def rings(self, district, max_ring=None):
+        """Districts grouped by borders crossed from `district`, nearest first"""
+        rings = self._rings.get(district, ((district,),))
+        return rings if max_ring is None else rings[:max_ring + 1]
+
+    def travel_km(self, source, target):
+        """Shortest travel distance between two districts, or None if unknown"""
+        km = self._distances.get(source, {}).get(target)
+        return round(km, 1) if km is not None else None
+
+    def path(self, source, target):
+        """Districts along the shortest route from source to target"""
+        if target not in self._distances.get(source, {}):
+            return []
+        previous = self._previous[source]
+        route = [target]
+        while route[-1] != source:
+            route.append(previous[route[-1]])
+        return route[::-1]
+
+
+district_graph = DistrictGraph(DISTRICT_BORDERS, DISTRICT_COORDINATES)
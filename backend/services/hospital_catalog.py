@@ -0,0 +1,129 @@
+"""
+Process-wide hospital catalog.
+
+Merges data/hospitals.json with the hospitals table once and keeps the
+result, with every response body already serialized: one per district
+plus the full listing, each with its ETag and a gzipped copy, and a
+prefix index for name search (utils/text_search.py). Each build has a
+version derived from its content, for URLs that can be cached as
+immutable. The catalog is rebuilt when
+hospitals.json changes (mtime, checked on every call) or when the
+'hospitals' table version moves (checked at most every
+HOSPITAL_CATALOG_CHECK_SECONDS), so the listing endpoints normally touch
+neither the file nor the database.
+"""
+import json
+import os
+import threading
+import time
+
+from config import Config
+from data.districts_data import DISTRICT_ALIASES
+from models import Hospital
+from services.versions import get_versions
+from utils.fastjson import precompute
+from utils.text_search import PrefixIndex
+
+HOSPITALS_JSON_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'hospitals.json')
+
+# Spelling variants in hospital names, on top of the district aliases
+SEARCH_ALIASES = dict(DISTRICT_ALIASES, govt='government', centre='center', speciality='specialty')
+
+
+def load_hospitals(json_path):
+    """
+    {district: [hospital dicts]} merged from the JSON file and the hospitals
+    table. JSON entries come first; a name already listed for the district
+    is not repeated.
+    """
+    json_hospitals = {}
+    if os.path.exists(json_path):
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                json_hospitals = json.load(f)
+        except Exception as e:
+            print(f"Error reading hospitals.json: {str(e)}")
+
+    merged = {}
+    for district, names in json_hospitals.items():
+        merged.setdefault(district, []).extend({'name': name, 'district': district} for name in names)
+    for hospital in Hospital.query.order_by(Hospital.id):
+        merged.setdefault(hospital.district, []).append(hospital.to_dict())
+
+    for district, hospitals in merged.items():
+        seen = set()
+        unique = []
+        for h in hospitals:
+            if h['name'] not in seen:
+                seen.add(h['name'])
+                unique.append(h)
+        merged[district] = unique
+    return merged
+
+
+class CatalogSnapshot:
+    """One immutable build of the catalog"""
+
+    def __init__(self, hospitals, json_mtime, db_version):
+        self.hospitals = hospitals
+        self.json_mtime = json_mtime
+        self.db_version = db_version
+        self.district_bodies = {
+            district: precompute({'district': district, 'hospitals': items, 'count': len(items)})
+            for district, items in hospitals.items()
+        }
+        self.all_body = precompute({'hospitals': hospitals})
+        # Same content, same version, whatever rebuilt the catalog
+        self.version = self.all_body[1][:12]
+
+        self.search_index = PrefixIndex(SEARCH_ALIASES)
+        for district, items in hospitals.items():
+            for hospital in items:
+                self.search_index.add(hospital['name'], hospital, context=(district,))
+
+    def district_body(self, district):
+        """(body, etag, gzipped) for a district's listing; unknown districts get an empty one"""
+        cached = self.district_bodies.get(district)
+        if cached is not None:
+            return cached
+        return precompute({'district': district, 'hospitals': [], 'count': 0}, compress=False)
+
+
+class HospitalCatalog:
+    def __init__(self, json_path, check_seconds):
+        self.json_path = json_path
+        self.check_seconds = check_seconds
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _json_mtime(self):
+        try:
+            return os.path.getmtime(self.json_path)
+        except OSError:
+            return None
+
+    def snapshot(self):
+        """The current catalog, rebuilt first if its sources changed"""
+        snapshot = self._snapshot
+        json_mtime = self._json_mtime()
+        if (snapshot is not None and snapshot.json_mtime == json_mtime
+                and time.monotonic() - self._checked_at < self.check_seconds):
+            return snapshot
+
+        with self._lock:
+            db_version = get_versions('hospitals')['hospitals']
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.json_mtime != json_mtime or snapshot.db_version != db_version:
+                snapshot = CatalogSnapshot(load_hospitals(self.json_path), json_mtime, db_version)
+                self._snapshot = snapshot
+            self._checked_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self):
+        """Drop the current build; the next call rebuilds"""
+        with self._lock:
+            self._snapshot = None
+
+
+hospital_catalog = HospitalCatalog(HOSPITALS_JSON_PATH, Config.HOSPITAL_CATALOG_CHECK_SECONDS)
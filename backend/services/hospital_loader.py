@@ -0,0 +1,129 @@
+"""
+Bulk hospital loading for setup_database.py.
+
+Sources are read as streams of row dicts (the built-in HOSPITALS_DATA, a
+hospitals.json-style file or a CSV), cut into chunks and written with
+one multi-row upsert per chunk keyed on the (district, name) unique
+index. Loading the same source twice leaves the table unchanged, and a
+source that omits a column (e.g. coordinates), or leaves a CSV cell
+blank, never blanks it on rows that already have it.
+"""
+import csv
+import json
+import time
+from itertools import islice
+
+from models import db, Hospital
+from services.versions import bump_version
+from utils.upsert import upsert
+
+DEFAULT_CHUNK_SIZE = 1000
+
+KEY_COLUMNS = ['district', 'name']
+CSV_COLUMNS = ['name', 'district', 'address', 'contact', 'latitude', 'longitude']
+
+
+def iter_builtin():
+    """Rows from data/hospitals_data.py"""
+    from data.hospitals_data import HOSPITALS_DATA
+
+    for district, hospitals in HOSPITALS_DATA.items():
+        for name, address, contact in hospitals:
+            yield {'name': name, 'district': district, 'address': address, 'contact': contact}
+
+
+def iter_json(path):
+    """Rows from a {district: [hospital name, ...]} file like data/hospitals.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for district, names in data.items():
+        for name in names:
+            yield {'name': name, 'district': district}
+
+
+def _float_or_none(value):
+    return float(value) if value not in (None, '') else None
+
+
+def iter_csv(path):
+    """
+    Rows from a CSV with a header row; name and district are required,
+    address, contact, latitude and longitude are optional columns.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = {'name', 'district'} - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+        columns = [c for c in CSV_COLUMNS if c in reader.fieldnames]
+        for record in reader:
+            row = {c: (record[c] or '').strip() or None for c in columns}
+            for c in ('latitude', 'longitude'):
+                if c in row:
+                    row[c] = _float_or_none(row[c])
+            yield row
+
+
+def open_source(source):
+    """Row iterator for 'builtin' or a path ending in .json or .csv"""
+    if source == 'builtin':
+        return iter_builtin()
+    if source.endswith('.json'):
+        return iter_json(source)
+    if source.endswith('.csv'):
+        return iter_csv(source)
+    raise ValueError(f"Unknown hospital source {source!r} (use 'builtin', a .json or a .csv file)")
+
+
+def load_hospitals(rows, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """
+    Upsert rows into the hospitals table, one statement and commit per
+    chunk. Rows without a name or district are skipped; within a chunk
+    later rows for a (district, name) override the non-empty values of
+    earlier ones. Returns a stats dict: 'rows' upserted, distinct
+    'hospitals' (keys) among them, 'skipped', 'chunks' and 'seconds'.
+    """
+    stats = {'rows': 0, 'hospitals': 0, 'skipped': 0, 'chunks': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+    rows = iter(rows)
+    seen = set()
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        unique = {}
+        for row in chunk:
+            if not row.get('name') or not row.get('district'):
+                stats['skipped'] += 1
+                continue
+            key = (row['district'], row['name'])
+            if key in unique:
+                row = {**unique[key], **{c: v for c, v in row.items() if v is not None}}
+            unique[key] = row
+        if unique:
+            values = list(unique.values())
+            update_columns = [c for c in values[0] if c not in KEY_COLUMNS]
+            try:
+                if update_columns:
+                    upsert(Hospital, values, KEY_COLUMNS, update_columns, keep_on_null=True)
+                else:
+                    # Nothing to update: an upsert that rewrites the key is a no-op
+                    upsert(Hospital, values, KEY_COLUMNS, ['name'])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            stats['rows'] += len(values)
+            seen.update(unique)
+            stats['hospitals'] = len(seen)
+        stats['chunks'] += 1
+        if progress:
+            progress(stats, time.perf_counter() - start)
+
+    if stats['rows']:
+        bump_version('hospitals')
+        db.session.commit()
+    stats['seconds'] = time.perf_counter() - start
+    return stats
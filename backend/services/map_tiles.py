@@ -0,0 +1,133 @@
+"""
+Per-tile cache of donor map clusters.
+
+The map is bucketed into geohash cells. At a given zoom, each visible cell
+becomes one cluster: a donor count and centroid, split by blood group. A
+viewport is covered by a few coarser "tiles" (one geohash character
+shorter than the cluster cells). The clusters inside each tile are computed
+with one grouped query and cached, so panning over tiles that were already
+seen does not touch the donors table.
+
+Donor writes invalidate only the tiles that contain the donor's geohash.
+Entries also expire after Config.MAP_TILE_TTL seconds, which bounds how
+stale a tile can get in other worker processes.
+"""
+import threading
+import time
+
+from sqlalchemy import func, or_
+
+from config import Config
+from models import db, Donor
+from utils.geo import covering_cells
+
+# Cluster cell precision by zoom level: (max zoom, geohash precision)
+ZOOM_PRECISION = [(3, 2), (5, 3), (8, 4), (10, 5), (12, 6), (14, 7)]
+
+
+def precision_for_zoom(zoom):
+    """Return the geohash precision of the cluster cells drawn at a zoom level"""
+    for max_zoom, precision in ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return ZOOM_PRECISION[-1][1]
+
+
+class TileCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._tiles = {}  # tile prefix -> {(precision, district): (expires_at, clusters)}
+        self._lock = threading.Lock()
+
+    def get_clusters(self, south, west, north, east, zoom, district=None):
+        """
+        Return cluster cells inside the box as a dict of
+        cell -> {blood_group: [count, sum_lat, sum_lon]}.
+        """
+        precision = precision_for_zoom(zoom)
+        tiles = covering_cells(south, west, north, east, max_precision=precision - 1)
+
+        now = time.monotonic()
+        key = (precision, district)
+        cells = {}
+        missing = []
+
+        with self._lock:
+            for tile in tiles:
+                entry = self._tiles.get(tile, {}).get(key)
+                if entry and entry[0] > now:
+                    cells.update(entry[1])
+                else:
+                    missing.append(tile)
+
+        if missing:
+            loaded = self._load(missing, precision, district)
+            expires_at = now + self.ttl
+            with self._lock:
+                for tile in missing:
+                    tile_cells = {c: v for c, v in loaded.items() if c.startswith(tile)}
+                    self._tiles.setdefault(tile, {})[key] = (expires_at, tile_cells)
+                    cells.update(tile_cells)
+
+        return cells
+
+    def _load(self, tiles, precision, district):
+        """Aggregate available donors in the given tiles with one grouped query"""
+        cell = func.substr(Donor.geohash, 1, precision)
+        query = db.session.query(
+            cell,
+            Donor.blood_group,
+            func.count(Donor.id),
+            func.sum(Donor.latitude),
+            func.sum(Donor.longitude)
+        ).filter(
+            Donor.is_available == True,
+            or_(*[Donor.geohash.like(tile + '%') for tile in tiles])
+        )
+        if district:
+            query = query.filter(Donor.district == district)
+
+        cells = {}
+        for cell_id, blood_group, count, sum_lat, sum_lon in query.group_by(cell, Donor.blood_group):
+            cells.setdefault(cell_id, {})[blood_group] = [count, sum_lat, sum_lon]
+        return cells
+
+    def invalidate(self, geohash):
+        """Drop every cached tile that contains the given donor geohash"""
+        if not geohash:
+            return
+        with self._lock:
+            for length in range(len(geohash) + 1):
+                self._tiles.pop(geohash[:length], None)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+
+
+tile_cache = TileCache(ttl=Config.MAP_TILE_TTL)
+
+
+def build_clusters(cells, south, west, north, east, blood_group=None):
+    """Turn cached cell aggregates into cluster dicts for cells whose centroid is in view"""
+    clusters = []
+    for cell_id, groups in cells.items():
+        if blood_group:
+            groups = {blood_group: groups[blood_group]} if blood_group in groups else {}
+        count = sum(g[0] for g in groups.values())
+        if not count:
+            continue
+
+        latitude = sum(g[1] for g in groups.values()) / count
+        longitude = sum(g[2] for g in groups.values()) / count
+        if not (south <= latitude <= north and west <= longitude <= east):
+            continue
+
+        clusters.append({
+            'cell': cell_id,
+            'latitude': latitude,
+            'longitude': longitude,
+            'count': count,
+            'blood_groups': {bg: g[0] for bg, g in groups.items()}
+        })
+    return clusters
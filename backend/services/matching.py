@@ -0,0 +1,108 @@
+"""
+Donor matching for blood requests.
+
+All matching goes through one query builder so exact and
+compatibility-aware matching share the (blood_group, district,
+is_available) index: compatible groups become a single `IN (...)` on
+blood_group rather than one query per group.
+
+widening_matches() searches outward from the request's district over the
+district adjacency graph, one ordered and LIMITed `district IN (...)`
+query per ring, until enough donors are found.
+"""
+from sqlalchemy import case, func, tuple_
+
+from config import Config
+from models import db, Donor
+from services.district_graph import district_graph
+from utils.blood import donor_groups_for
+
+
+def matching_donors_query(blood_group, district, compatible=False, exact_first=False):
+    """
+    Available donors in `district` (a name or a list of names) who can give
+    to a `blood_group` recipient.
+
+    With compatible=False only the exact group matches. exact_first orders
+    exact-group donors ahead of the other compatible groups.
+    """
+    groups = donor_groups_for(blood_group, compatible)
+
+    if isinstance(district, str):
+        query = Donor.query.filter(Donor.district == district, Donor.is_available == True)
+    else:
+        query = Donor.query.filter(Donor.district.in_(district), Donor.is_available == True)
+    if len(groups) == 1:
+        query = query.filter(Donor.blood_group == groups[0])
+    else:
+        query = query.filter(Donor.blood_group.in_(groups))
+
+    if exact_first and len(groups) > 1:
+        query = query.order_by(case((Donor.blood_group == blood_group, 0), else_=1), Donor.id)
+
+    return query
+
+
+def widening_matches(blood_group, district, target, compatible=False, exact_first=False,
+                     max_ring=None, columns=None):
+    """
+    Matching donors from the request's district outward, ring by ring.
+
+    Ring 0 is the district itself, ring n the districts n borders away.
+    Returns at most `target` donors: each ring reads only the donors still
+    missing, and the search stops once it has them or after max_ring
+    (default Config.MATCH_MAX_RING). Within a ring, donors from nearer
+    districts come first (exact-group donors first with exact_first).
+    `columns` projects the rows instead of loading Donor objects.
+
+    Returns ([(ring, donor)], [{'ring', 'districts', 'count'}]).
+    """
+    if max_ring is None:
+        max_ring = Config.MATCH_MAX_RING
+
+    found = []
+    rings = []
+    for ring, districts in enumerate(district_graph.rings(district, max_ring)):
+        query = matching_donors_query(blood_group, list(districts), compatible=compatible)
+        if columns:
+            query = query.with_entities(*columns)
+
+        # Order in SQL so the LIMIT keeps the nearest (and with exact_first, exact-group) donors
+        order = []
+        if exact_first:
+            order.append(case((Donor.blood_group == blood_group, 0), else_=1))
+        if len(districts) > 1:
+            order.append(case({name: i for i, name in enumerate(districts)}, value=Donor.district))
+        query = query.order_by(*order, Donor.id)
+        if target > len(found):
+            query = query.limit(target - len(found))
+        rows = query.all()
+
+        found.extend((ring, row) for row in rows)
+        rings.append({'ring': ring, 'districts': list(districts), 'count': len(rows)})
+        if len(found) >= target:
+            break
+
+    return found, rings
+
+
+def matching_counts(pairs):
+    """
+    Available donor counts for many (district, blood_group) pairs with one
+    grouped query; pairs without donors are reported as 0.
+    """
+    pairs = set(pairs)
+    counts = dict.fromkeys(pairs, 0)
+    if not pairs:
+        return counts
+
+    rows = db.session.query(
+        Donor.district, Donor.blood_group, func.count(Donor.id)
+    ).filter(
+        tuple_(Donor.district, Donor.blood_group).in_(pairs),
+        Donor.is_available == True
+    ).group_by(Donor.district, Donor.blood_group)
+
+    for district, blood_group, count in rows:
+        counts[(district, blood_group)] = count
+    return counts
@@ -0,0 +1,262 @@
+"""
+Durable notification outbox.
+
+The notify endpoint writes one row per SMS into notification_outbox in a
+single batched insert and returns straight away. Worker threads drain the
+table:
+
+- claim: select a batch of due 'pending' rows, highest priority first,
+  with FOR UPDATE SKIP LOCKED, and mark them 'sending' under the worker's
+  id. Several workers (threads or processes) can drain the table at once
+  without picking the same rows.
+- send: push the batch through the urgency dispatcher (bounded fan-out).
+- record: mark rows 'sent', or back to 'pending' with an exponential
+  backoff, or 'dead' once OUTBOX_MAX_ATTEMPTS is reached. Sends held back
+  by the SMS rate limit go back to 'pending' without using an attempt.
+
+A claim left behind by a crashed worker is handed back after
+OUTBOX_CLAIM_TIMEOUT_SECONDS by release_stale_claims(). Delivery is
+at-least-once: a send that timed out may have gone through and is retried.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+import os
+import random
+import socket
+import threading
+
+from sqlalchemy import func, update
+
+from config import Config
+from models import db, NotificationJob, OutboxMessage
+from services.dispatch import dispatcher, URGENCY_CLASSES
+from services.sms import send_sms
+
+URGENCY_PRIORITY = {'critical': 2, 'urgent': 1, 'normal': 0}
+
+# Statuses of a message that has not reached a final state
+OPEN_STATUSES = ('pending', 'sending')
+
+
+def enqueue(job, message, recipients):
+    """Add one outbox row per (donor_id, phone) for a job; caller commits"""
+    urgency = job.urgency if job.urgency in URGENCY_PRIORITY else 'normal'
+    now = datetime.utcnow()
+    db.session.execute(OutboxMessage.__table__.insert(), [
+        {
+            'job_id': job.id,
+            'donor_id': donor_id,
+            'phone': phone,
+            'body': message,
+            'urgency': urgency,
+            'priority': URGENCY_PRIORITY[urgency],
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_at': now,
+        }
+        for donor_id, phone in recipients
+    ])
+
+
+def backoff_delay(attempts):
+    """Seconds before retry number `attempts`, doubling each time, with jitter"""
+    delay = min(Config.OUTBOX_BACKOFF_SECONDS * (2 ** (attempts - 1)), Config.OUTBOX_BACKOFF_MAX_SECONDS)
+    return delay + random.uniform(0, delay * 0.1)
+
+
+def claim_batch(worker_id, limit):
+    """Claim up to `limit` due messages for worker_id and return them"""
+    now = datetime.utcnow()
+    ids = [row.id for row in db.session.query(OutboxMessage.id).filter(
+        OutboxMessage.status == 'pending',
+        OutboxMessage.next_attempt_at <= now
+    ).order_by(
+        OutboxMessage.priority.desc(), OutboxMessage.id
+    ).limit(limit).with_for_update(skip_locked=True)]
+
+    if not ids:
+        db.session.rollback()
+        return []
+
+    # The status guard keeps the claim safe on databases without SKIP LOCKED
+    db.session.execute(update(OutboxMessage).where(
+        OutboxMessage.id.in_(ids),
+        OutboxMessage.status == 'pending'
+    ).values(status='sending', claimed_by=worker_id, claimed_at=now))
+    db.session.commit()
+
+    return db.session.query(
+        OutboxMessage.id, OutboxMessage.job_id, OutboxMessage.phone,
+        OutboxMessage.body, OutboxMessage.urgency, OutboxMessage.attempts
+    ).filter(
+        OutboxMessage.id.in_(ids),
+        OutboxMessage.status == 'sending',
+        OutboxMessage.claimed_by == worker_id
+    ).all()
+
+
+def send_batch(messages):
+    """Send claimed messages, one bounded fan-out per urgency class; returns [(message, result)]"""
+    by_urgency = defaultdict(list)
+    for message in messages:
+        by_urgency[message.urgency].append(message)
+
+    outcomes = []
+    for urgency in URGENCY_CLASSES:
+        batch = by_urgency.pop(urgency, [])
+        results = dispatcher.fan_out(
+            urgency,
+            lambda message: send_sms(message.phone, message.body),
+            batch,
+            parallelism=Config.SMS_FANOUT_CONCURRENCY,
+            timeout=Config.SMS_SEND_TIMEOUT
+        )
+        outcomes.extend(zip(batch, results))
+    return outcomes
+
+
+def record_results(worker_id, outcomes):
+    """Write back sent / retry / dead-letter for a batch this worker still holds"""
+    now = datetime.utcnow()
+    updates = []
+    for message, result in outcomes:
+        if isinstance(result, Exception):
+            result = {'success': False, 'message': str(result) or type(result).__name__}
+        attempts = message.attempts + 1
+
+        if result['success']:
+            status, next_attempt_at, error = 'sent', now, None
+        elif result.get('throttled'):
+            attempts = message.attempts
+            status = 'pending'
+            next_attempt_at = now + timedelta(seconds=Config.SMS_THROTTLE_PAUSE_SECONDS)
+            error = result.get('message')
+        elif attempts >= Config.OUTBOX_MAX_ATTEMPTS or not result.get('retry', True):
+            status, next_attempt_at, error = 'dead', now, result.get('message')
+        else:
+            status = 'pending'
+            next_attempt_at = now + timedelta(seconds=backoff_delay(attempts))
+            error = result.get('message')
+
+        updates.append({
+            'id': message.id,
+            'status': status,
+            'attempts': attempts,
+            'next_attempt_at': next_attempt_at,
+            'claimed_by': None,
+            'last_error': error[:255] if error else None,
+            'provider_sid': result.get('sid'),
+            'sent_at': now if status == 'sent' else None,
+        })
+
+    if updates:
+        # Bulk UPDATE by primary key; rows whose claim was taken over are left alone
+        db.session.execute(
+            update(OutboxMessage).where(OutboxMessage.claimed_by == worker_id),
+            updates,
+            execution_options={'synchronize_session': None}
+        )
+        complete_jobs({message.job_id for message, _ in outcomes}, now)
+    db.session.commit()
+
+
+def complete_jobs(job_ids, now):
+    """Mark jobs with no open messages left as completed; caller commits"""
+    open_jobs = {row.job_id for row in db.session.query(OutboxMessage.job_id).filter(
+        OutboxMessage.job_id.in_(job_ids),
+        OutboxMessage.status.in_(OPEN_STATUSES)
+    ).distinct()}
+    done = set(job_ids) - open_jobs
+    if done:
+        db.session.execute(update(NotificationJob).where(
+            NotificationJob.id.in_(done),
+            NotificationJob.status != 'completed'
+        ).values(status='completed', completed_at=now))
+
+
+def release_stale_claims():
+    """Hand messages held past the claim timeout back to the queue; returns how many"""
+    cutoff = datetime.utcnow() - timedelta(seconds=Config.OUTBOX_CLAIM_TIMEOUT_SECONDS)
+    released = db.session.execute(update(OutboxMessage).where(
+        OutboxMessage.status == 'sending',
+        OutboxMessage.claimed_at < cutoff
+    ).values(status='pending', claimed_by=None)).rowcount
+    db.session.commit()
+    return released
+
+
+def job_progress(job_id):
+    """Message counts per status for a job"""
+    progress = dict.fromkeys(('pending', 'sending', 'sent', 'dead'), 0)
+    rows = db.session.query(OutboxMessage.status, func.count(OutboxMessage.id)).filter(
+        OutboxMessage.job_id == job_id
+    ).group_by(OutboxMessage.status).all()
+    for status, count in rows:
+        progress[status] = count
+    return progress
+
+
+def backlog():
+    """Open outbox messages per status, across all jobs"""
+    rows = db.session.query(OutboxMessage.status, func.count(OutboxMessage.id)).filter(
+        OutboxMessage.status.in_(OPEN_STATUSES)
+    ).group_by(OutboxMessage.status).all()
+    result = dict.fromkeys(OPEN_STATUSES, 0)
+    result.update(dict(rows))
+    return result
+
+
+class OutboxWorker:
+    """Background thread that claims, sends and records outbox batches"""
+
+    def __init__(self, app, index=0):
+        self.app = app
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{index}'[:64]
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'outbox-{index}', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def run_once(self):
+        """Process one batch; returns the number of messages handled"""
+        messages = claim_batch(self.worker_id, Config.OUTBOX_BATCH_SIZE)
+        if messages:
+            record_results(self.worker_id, send_batch(messages))
+        return len(messages)
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    handled = self.run_once()
+            except Exception as e:
+                print(f"Outbox worker {self.worker_id} failed: {str(e)}")
+                with self.app.app_context():
+                    db.session.rollback()
+                handled = 0
+
+            if not handled:
+                self._wake.wait(Config.OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+
+
+_workers = []
+
+
+def start_workers(app, count):
+    """Start `count` outbox worker threads for this process"""
+    for i in range(count):
+        worker = OutboxWorker(app, len(_workers))
+        worker.start()
+        _workers.append(worker)
+
+
+def wake_workers():
+    """Nudge idle workers after new messages were committed"""
+    for worker in _workers:
+        worker.wake()
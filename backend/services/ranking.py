@@ -0,0 +1,97 @@
+"""
+Top-k ranking of matching donors for a blood request.
+
+Each candidate gets a score in [0, 1] from:
+- distance: closeness to the request's hospital, 1 / (1 + km / scale)
+- recency: how recently the donor registered, exp(-age_days / 14)
+- expiry: time left before auto_remove_date, as a fraction of 14 days
+
+combined with the weights in Config.MATCH_WEIGHTS (equal weights if they
+sum to zero). Request urgency scales
+the distance weight (Config.URGENCY_DISTANCE_FACTOR), so critical requests
+favour the closest donors. Candidates are scored in one pass and the best
+k are kept in a bounded heap, never sorting the full list.
+"""
+from datetime import datetime
+import heapq
+import math
+
+from config import Config
+from data.districts_data import DISTRICT_COORDINATES
+from models import Hospital
+from utils.geo import haversine_km
+
+DONOR_WINDOW_DAYS = 14
+
+
+def request_location(blood_request):
+    """(lat, lon) of the request's hospital, falling back to its district headquarters"""
+    hospital = Hospital.query.filter_by(
+        district=blood_request.district, name=blood_request.hospital
+    ).with_entities(Hospital.latitude, Hospital.longitude).first()
+
+    if hospital and hospital.latitude is not None and hospital.longitude is not None:
+        return hospital.latitude, hospital.longitude
+    return DISTRICT_COORDINATES.get(blood_request.district)
+
+
+def score_donor(donor, origin, distance_weight, now):
+    """Return (score, distance_km) for a donor row"""
+    weights = Config.MATCH_WEIGHTS
+
+    distance_km = None
+    if origin is not None:
+        if donor.latitude is not None and donor.longitude is not None:
+            distance_km = haversine_km(origin[0], origin[1], donor.latitude, donor.longitude)
+        elif donor.district in DISTRICT_COORDINATES:
+            distance_km = haversine_km(origin[0], origin[1], *DISTRICT_COORDINATES[donor.district])
+    distance_score = 1 / (1 + distance_km / Config.MATCH_DISTANCE_SCALE_KM) if distance_km is not None else 0.5
+
+    recency_score = 0.0
+    if donor.registered_at:
+        age_days = max((now - donor.registered_at).total_seconds() / 86400, 0)
+        recency_score = math.exp(-age_days / DONOR_WINDOW_DAYS)
+
+    expiry_score = 0.0
+    if donor.auto_remove_date:
+        days_left = (donor.auto_remove_date - now).total_seconds() / 86400
+        expiry_score = min(max(days_left / DONOR_WINDOW_DAYS, 0.0), 1.0)
+
+    recency_weight, expiry_weight = weights['recency'], weights['expiry']
+    total_weight = distance_weight + recency_weight + expiry_weight
+    if total_weight <= 0:
+        # Every weight configured (or scaled) to zero: weigh the factors equally
+        distance_weight = recency_weight = expiry_weight = 1.0
+        total_weight = 3.0
+    score = (
+        distance_weight * distance_score
+        + recency_weight * recency_score
+        + expiry_weight * expiry_score
+    ) / total_weight
+    return score, distance_km
+
+
+def rank_donors(blood_request, rows, k):
+    """
+    Best k donors from `rows` (DONOR_COLUMNS rows of matching donors) for
+    the request, as dicts with 'score' and 'distance_km' added, best first.
+    """
+    origin = request_location(blood_request)
+    distance_weight = Config.MATCH_WEIGHTS['distance'] * Config.URGENCY_DISTANCE_FACTOR.get(
+        blood_request.urgency, 1.0
+    )
+    now = datetime.utcnow()
+
+    scored = (
+        score_donor(donor, origin, distance_weight, now) + (donor.id, donor)
+        for donor in rows
+    )
+    best = heapq.nlargest(k, scored, key=lambda s: (s[0], -s[2]))
+
+    donors = []
+    for score, distance_km, _, donor in best:
+        donor_dict = donor._asdict()
+        donor_dict['score'] = round(score, 4)
+        donor_dict['distance_km'] = round(distance_km, 2) if distance_km is not None else None
+        donors.append(donor_dict)
+    return donors
@@ -0,0 +1,180 @@
+"""
+SMS delivery through a pluggable transport.
+
+Config.SMS_TRANSPORT picks the transport:
+- 'twilio': the Twilio REST API
+- 'memory': keeps messages in a list, for tests and offline runs
+- 'http_fake': POSTs to a local fake provider
+  (benchmarks/fake_sms_provider.py) at SMS_FAKE_PROVIDER_URL
+- 'log' (or unset without Twilio credentials): mock mode, prints the
+  message. Mock sends report `retry: False` so the outbox does not keep
+  retrying a message that can never go out.
+
+Every send through a real transport first takes a token from a
+process-wide token bucket (SMS_RATE_PER_SECOND, SMS_RATE_BURST), so all
+sender threads share one budget. When it is spent, sends wait their turn
+for up to SMS_RATE_MAX_WAIT seconds. A send that would wait longer, or
+that the provider answers with 429, is reported as `throttled`; a 429 also
+pauses the bucket for SMS_THROTTLE_PAUSE_SECONDS. The outbox requeues
+throttled messages without counting an attempt.
+"""
+from abc import ABC, abstractmethod
+import itertools
+import threading
+import time
+
+from config import Config
+from utils.rate_limit import TokenBucket
+
+
+class SmsError(Exception):
+    """A send the provider refused; `status` is its HTTP status code"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class SmsTransport(ABC):
+    """Delivers one message; returns {'success': True, 'sid': ...} or raises"""
+    name = 'base'
+    # Whether sends go through the shared rate limiter
+    rate_limited = True
+
+    @abstractmethod
+    def send(self, to_phone, body):
+        ...
+
+
+class TwilioTransport(SmsTransport):
+    name = 'twilio'
+
+    def __init__(self, account_sid, auth_token, from_number, timeout):
+        from twilio.rest import Client
+        from twilio.http.http_client import TwilioHttpClient
+        self.from_number = from_number
+        self.client = Client(account_sid, auth_token, http_client=TwilioHttpClient(timeout=timeout))
+
+    def send(self, to_phone, body):
+        message_obj = self.client.messages.create(body=body, from_=self.from_number, to=to_phone)
+        return {'success': True, 'sid': message_obj.sid}
+
+
+class InMemoryTransport(SmsTransport):
+    """Records messages instead of sending them; optional per-send latency in seconds"""
+    name = 'memory'
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self.messages = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def send(self, to_phone, body):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            sid = f'MEM{next(self._ids)}'
+            self.messages.append({'sid': sid, 'to': to_phone, 'body': body})
+        return {'success': True, 'sid': sid}
+
+    def clear(self):
+        with self._lock:
+            self.messages.clear()
+
+
+class HttpFakeTransport(SmsTransport):
+    """Sends to a local fake provider over HTTP, one keep-alive session per thread"""
+    name = 'http_fake'
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+        return session
+
+    def send(self, to_phone, body):
+        response = self._session().post(self.url, data={'To': to_phone, 'Body': body}, timeout=self.timeout)
+        if response.status_code not in (200, 201):
+            raise SmsError(f'Provider returned {response.status_code}', status=response.status_code)
+        return {'success': True, 'sid': response.json().get('sid')}
+
+
+class LogTransport(SmsTransport):
+    """Mock mode: prints the message and reports SMS as not configured"""
+    name = 'log'
+    rate_limited = False
+
+    def send(self, to_phone, body):
+        print(f"[SMS Mock] To: {to_phone}, Message: {body}")
+        return {'success': False, 'message': 'SMS service not configured', 'retry': False}
+
+
+def create_transport(name=None):
+    """Build the transport named by `name` (default Config.SMS_TRANSPORT)"""
+    name = name or Config.SMS_TRANSPORT
+    if not name:
+        configured = Config.TWILIO_ACCOUNT_SID and Config.TWILIO_AUTH_TOKEN and Config.TWILIO_PHONE_NUMBER
+        name = 'twilio' if configured else 'log'
+
+    if name == 'twilio':
+        try:
+            return TwilioTransport(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN,
+                                   Config.TWILIO_PHONE_NUMBER, Config.SMS_SEND_TIMEOUT)
+        except ImportError:
+            print("Twilio not installed. SMS notifications will be disabled.")
+            return LogTransport()
+    if name == 'memory':
+        return InMemoryTransport()
+    if name == 'http_fake':
+        return HttpFakeTransport(Config.SMS_FAKE_PROVIDER_URL, Config.SMS_SEND_TIMEOUT)
+    if name == 'log':
+        return LogTransport()
+    raise ValueError(f'Unknown SMS transport: {name}')
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """The process-wide transport, created on first use"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = create_transport()
+    return _transport
+
+
+def set_transport(transport):
+    """Swap the process-wide transport (tests, benchmarks)"""
+    global _transport
+    with _transport_lock:
+        _transport = transport
+
+
+sms_limiter = TokenBucket(Config.SMS_RATE_PER_SECOND, Config.SMS_RATE_BURST)
+
+
+def send_sms(to_phone, message):
+    """Send SMS via the configured transport"""
+    transport = get_transport()
+
+    if transport.rate_limited and not sms_limiter.acquire(timeout=Config.SMS_RATE_MAX_WAIT):
+        return {'success': False, 'message': 'SMS rate limit reached', 'throttled': True}
+
+    try:
+        return transport.send(to_phone, message)
+    except Exception as e:
+        if getattr(e, 'status', None) == 429:
+            sms_limiter.throttle(Config.SMS_THROTTLE_PAUSE_SECONDS)
+            return {'success': False, 'message': str(e), 'throttled': True}
+        print(f"SMS sending failed: {str(e)}")
+        return {'success': False, 'message': str(e)}
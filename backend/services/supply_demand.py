@@ -0,0 +1,162 @@
+"""
+District x blood group supply/demand matrix.
+
+Supply is the available donors and demand the pending requests per
+(district, blood group), each loaded with one grouped COUNT into a
+32 x 8 NumPy array. Everything else is derived with array operations:
+- compatible supply: supply @ C.T, where C[r, g] is 1 when recipient
+  group r can receive from donor group g (utils.blood.DONOR_MASK); a
+  donor counts towards every group it can give to, so this is potential
+  supply only
+- unmet demand: what is left after allocating each donor to at most one
+  request, recipients with the fewest compatible groups first (O- before
+  AB+), each drawing on the donor groups fewest others can use (O- last)
+- shortage ratio: demand / compatible supply (null where there is demand
+  but no compatible donor)
+- district ranking: most unmet demand first, then highest total
+  demand-to-supply ratio
+
+The result is cached per (donors, requests) table version, so it is
+recomputed only after a donor or request write.
+"""
+import threading
+
+import numpy as np
+from sqlalchemy import func
+
+from data.districts_data import DISTRICT_COORDINATES
+from models import db, Donor, Request
+from services.versions import get_versions
+from utils.blood import BLOOD_GROUPS, DONOR_MASK
+from utils.fastjson import precompute
+
+DISTRICTS = list(DISTRICT_COORDINATES)
+DISTRICT_INDEX = {name: i for i, name in enumerate(DISTRICTS)}
+GROUP_INDEX = {group: i for i, group in enumerate(BLOOD_GROUPS)}
+
+# COMPATIBILITY[r, g] = 1 when recipient group r can receive from donor group g
+COMPATIBILITY = (
+    np.array([DONOR_MASK[recipient] for recipient in BLOOD_GROUPS])[:, None]
+    >> np.arange(len(BLOOD_GROUPS)) & 1
+).astype(np.int64)
+
+
+def _grouped_counts(query):
+    """Fill a districts x blood groups array from (district, blood_group, count) rows"""
+    rows = [
+        (DISTRICT_INDEX[district], GROUP_INDEX[blood_group], count)
+        for district, blood_group, count in query
+        if district in DISTRICT_INDEX and blood_group in GROUP_INDEX
+    ]
+    matrix = np.zeros((len(DISTRICTS), len(BLOOD_GROUPS)), dtype=np.int64)
+    if rows:
+        d, g, counts = np.array(rows, dtype=np.int64).T
+        matrix[d, g] = counts
+    return matrix
+
+
+def load_matrices():
+    """(supply, demand) arrays: available donors and pending requests"""
+    supply = _grouped_counts(db.session.query(
+        Donor.district, Donor.blood_group, func.count(Donor.id)
+    ).filter(Donor.is_available == True).group_by(Donor.district, Donor.blood_group))
+    demand = _grouped_counts(db.session.query(
+        Request.district, Request.blood_group, func.count(Request.id)
+    ).filter(Request.status == 'pending').group_by(Request.district, Request.blood_group))
+    return supply, demand
+
+
+# Allocation order: recipients with the fewest compatible donor groups first, and
+# for each, the donor groups the fewest recipient groups can use first
+RECIPIENT_ORDER = np.argsort(COMPATIBILITY.sum(axis=1), kind='stable')
+DONOR_PREFERENCE = np.argsort(COMPATIBILITY.sum(axis=0), kind='stable')
+
+
+def allocate(supply, demand):
+    """Unmet demand after giving each donor to at most one compatible request, per district"""
+    remaining_supply = supply.copy()
+    unmet = demand.copy()
+    for r in RECIPIENT_ORDER:
+        for g in DONOR_PREFERENCE:
+            if COMPATIBILITY[r, g]:
+                given = np.minimum(unmet[:, r], remaining_supply[:, g])
+                unmet[:, r] -= given
+                remaining_supply[:, g] -= given
+    return unmet
+
+
+def _ratio(numerator, denominator):
+    """numerator / denominator as nested lists: 0 where nothing is needed, None where nothing is available"""
+    ratio = np.divide(numerator, denominator, out=np.zeros(numerator.shape), where=denominator > 0)
+    ratio = np.round(ratio, 3).astype(object)
+    ratio[(denominator == 0) & (numerator > 0)] = None
+    return ratio.tolist()
+
+
+def build_matrix(supply, demand):
+    """The supply/demand payload for the given arrays"""
+    compatible_supply = supply @ COMPATIBILITY.T
+    unmet = allocate(supply, demand)
+
+    district_demand = demand.sum(axis=1)
+    district_supply = supply.sum(axis=1)
+    district_unmet = unmet.sum(axis=1)
+    pressure = np.divide(district_demand, district_supply, out=np.full(len(DISTRICTS), np.inf),
+                         where=district_supply > 0)
+    pressure[district_demand == 0] = 0
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((-pressure, -district_unmet))
+
+    groups = np.array(BLOOD_GROUPS)
+    rankings = [
+        {
+            'rank': rank + 1,
+            'district': DISTRICTS[i],
+            'open_requests': int(district_demand[i]),
+            'available_donors': int(district_supply[i]),
+            'unmet_requests': int(district_unmet[i]),
+            'short_groups': groups[unmet[i] > 0].tolist()
+        }
+        for rank, i in enumerate(order)
+    ]
+
+    return {
+        'districts': DISTRICTS,
+        'blood_groups': BLOOD_GROUPS,
+        'supply': supply.tolist(),
+        'demand': demand.tolist(),
+        'compatible_supply': compatible_supply.tolist(),
+        'unmet': unmet.tolist(),
+        'shortage_ratio': _ratio(demand, compatible_supply),
+        'totals': {
+            'supply': dict(zip(BLOOD_GROUPS, supply.sum(axis=0).tolist())),
+            'demand': dict(zip(BLOOD_GROUPS, demand.sum(axis=0).tolist())),
+            'unmet': dict(zip(BLOOD_GROUPS, unmet.sum(axis=0).tolist()))
+        },
+        'rankings': rankings
+    }
+
+
+class SupplyDemandCache:
+    def __init__(self):
+        self._key = None
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """(body, etag, gzipped) of the current matrix, rebuilt when donors or requests changed"""
+        versions = get_versions('donors', 'requests')
+        key = (versions['donors'], versions['requests'])
+        with self._lock:
+            if key == self._key:
+                return self._value
+
+        payload = build_matrix(*load_matrices())
+        payload['versions'] = versions
+        value = precompute(payload)
+        with self._lock:
+            self._key, self._value = key, value
+        return value
+
+
+supply_demand = SupplyDemandCache()
@@ -0,0 +1,76 @@
+"""
+Per-table change versions and conditional GET support.
+
+Every write to donors, requests or hospitals bumps that table's row in
+`table_versions` inside the same transaction. Read endpoints derive a
+strong ETag from the versions of the tables they read plus the request
+path and query string, so a client revalidating with If-None-Match gets a
+304 after a single primary-key lookup, without running the main query.
+"""
+from functools import wraps
+import hashlib
+
+from flask import current_app, make_response, request
+from sqlalchemy import update
+
+from models import db, TableVersion
+
+
+def bump_version(*tables):
+    """Increment the change version of each table in the current transaction"""
+    result = db.session.execute(
+        update(TableVersion)
+        .where(TableVersion.name.in_(tables))
+        .values(version=TableVersion.version + 1)
+    )
+    if result.rowcount < len(tables):
+        existing = {
+            name for (name,) in
+            db.session.query(TableVersion.name).filter(TableVersion.name.in_(tables))
+        }
+        for name in set(tables) - existing:
+            db.session.add(TableVersion(name=name, version=1))
+
+
+def get_versions(*tables):
+    """{table: version} for the given tables (0 for tables never written)"""
+    rows = db.session.query(TableVersion.name, TableVersion.version).filter(
+        TableVersion.name.in_(tables)
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update(rows)
+    return versions
+
+
+def conditional_get(*tables, extra=None):
+    """
+    Decorator adding ETag/If-None-Match handling to a GET view.
+
+    The ETag covers the versions of `tables`, the full request path and,
+    if given, the string returned by `extra()` (e.g. a data file mtime).
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            versions = get_versions(*tables)
+            key = '|'.join(
+                [request.full_path]
+                + [f'{name}={versions[name]}' for name in tables]
+                + ([extra()] if extra else [])
+            )
+            etag = hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+            # Weak comparison: compression turns the ETag weak (utils/compression.py)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return decorated
+    return decorator
@@ -4,13 +4,21 @@ Database setup script for BloodLink TN
 - Creates database if not exists
 - Creates all tables
 - Populates Tamil Nadu districts (through hospitals)
-- Populates 400+ hospitals with addresses and contact numbers
+- Upserts 400+ hospitals with addresses and contact numbers, or any
+  hospitals.json-style or CSV file, in bulk chunks keyed on (district, name)
+
+    python setup_database.py
+    python setup_database.py --yes --source hospitals.csv --chunk-size 5000
+    python setup_database.py --replace --yes
 """
+import argparse
 import pymysql
-from app import app, db
+from app import create_app, db
 from models import User, Donor, Request, Hospital
+from services.hospital_loader import DEFAULT_CHUNK_SIZE, load_hospitals, open_source
+from services.versions import bump_version
 from config import Config
-from data.hospitals_data import HOSPITALS_DATA, TAMIL_NADU_DISTRICTS
+from data.hospitals_data import TAMIL_NADU_DISTRICTS
 import sys
 
 
@@ -42,15 +50,38 @@ def create_database_if_not_exists():
         return False
 
 
-def setup_database():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default='builtin',
+                        help="hospitals to load: 'builtin' (data/hospitals_data.py), a .json or a .csv file")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows per upsert statement')
+    parser.add_argument('--replace', action='store_true', help='delete all hospitals before loading')
+    parser.add_argument('--yes', '-y', action='store_true', help='do not ask for confirmation')
+    parser.add_argument('--database-uri', default=None, help='defaults to the MySQL database from .env')
+    return parser.parse_args(argv)
+
+
+def print_progress(stats, elapsed):
+    rate = stats['rows'] / elapsed if elapsed else 0
+    print(f"\r   {stats['rows']} rows upserted ({rate:,.0f} rows/s)", end='', flush=True)
+
+
+def setup_database(args):
     """Initialize database and create all tables"""
     print("=" * 60)
     print("BloodLink TN - Database Setup")
     print("=" * 60)
     
+    if args.database_uri:
+        Config.SQLALCHEMY_DATABASE_URI = args.database_uri
+    # Build the app without starting the scheduler or outbox workers
+    app = create_app(start_background=False)
+    
     # Step 1: Create database if not exists
     print("\n[1/4] Creating database if not exists...")
-    if not create_database_if_not_exists():
+    if not Config.SQLALCHEMY_DATABASE_URI.startswith('mysql'):
+        print("⏭️  Not a MySQL database, skipping")
+    elif not create_database_if_not_exists():
         sys.exit(1)
     
     # Step 2: Create tables
@@ -64,50 +95,36 @@ def setup_database():
         sys.exit(1)
     
     # Step 3: Populate hospitals
-    print("\n[3/4] Populating Tamil Nadu hospitals...")
+    print(f"\n[3/4] Loading hospitals from {args.source}...")
     try:
+        rows = open_source(args.source)
         with app.app_context():
-            # Count existing hospitals
             existing_count = Hospital.query.count()
             
-            if existing_count > 0:
+            if existing_count > 0 and args.replace:
                 print(f"⚠️  Found {existing_count} existing hospitals in database")
-                response = input("Do you want to clear and repopulate? (y/n): ").strip().lower()
-                if response == 'y':
+                confirmed = args.yes or input("Do you want to delete them before loading? (y/n): ").strip().lower() == 'y'
+                if confirmed:
                     Hospital.query.delete()
+                    bump_version('hospitals')
                     db.session.commit()
                     print("✅ Cleared existing hospitals")
                 else:
-                    print("⏭️  Skipping hospital population (keeping existing data)")
-                    print("\n✅ Database setup complete!")
-                    print(f"   - {len(TAMIL_NADU_DISTRICTS)} Tamil Nadu districts covered")
-                    print(f"   - {existing_count} hospitals in database")
-                    return
-            
-            # Insert hospitals
-            total_hospitals = 0
-            districts_covered = set()
-            
-            for district, hospitals in HOSPITALS_DATA.items():
-                districts_covered.add(district)
-                for name, address, contact in hospitals:
-                    hospital = Hospital(
-                        name=name,
-                        district=district,
-                        address=address,
-                        contact=contact
-                    )
-                    db.session.add(hospital)
-                    total_hospitals += 1
+                    print("⏭️  Keeping existing hospitals; matching (district, name) rows are updated")
+            elif existing_count > 0:
+                print(f"ℹ️  Found {existing_count} existing hospitals; matching (district, name) rows are updated")
             
-            db.session.commit()
+            stats = load_hospitals(rows, args.chunk_size, progress=print_progress)
+            total_hospitals = stats['hospitals']
+            rate = stats['rows'] / stats['seconds'] if stats['seconds'] else 0
             
-            print(f"✅ Inserted {total_hospitals} hospitals")
-            print(f"✅ Covered {len(districts_covered)} districts")
+            print(f"\n✅ Upserted {total_hospitals} hospitals in {stats['chunks']} chunks, "
+                  f"{stats['seconds']:.2f}s ({rate:,.0f} rows/s)")
+            if stats['skipped']:
+                print(f"⚠️  Skipped {stats['skipped']} rows without a name or district")
             
     except Exception as e:
-        print(f"❌ Error populating hospitals: {str(e)}")
-        db.session.rollback()
+        print(f"\n❌ Error populating hospitals: {str(e)}")
         sys.exit(1)
     
     # Step 4: Verification
@@ -148,4 +165,4 @@ def setup_database():
 
 
 if __name__ == '__main__':
-    setup_database()
+    setup_database(parse_args())
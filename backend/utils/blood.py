@@ -0,0 +1,53 @@
+"""
+ABO/Rh blood group compatibility.
+
+Each group is a bitmask of the antigens on its red cells (A, B, RhD). A
+donor can give to a recipient when the donor carries no antigen the
+recipient lacks, i.e. donor_bits & ~recipient_bits == 0. The lookup tables
+below are computed once at import so matching never re-derives them.
+"""
+
+ANTIGEN_A = 1
+ANTIGEN_B = 2
+ANTIGEN_RH = 4
+
+ANTIGENS = {
+    'O-': 0,
+    'O+': ANTIGEN_RH,
+    'A-': ANTIGEN_A,
+    'A+': ANTIGEN_A | ANTIGEN_RH,
+    'B-': ANTIGEN_B,
+    'B+': ANTIGEN_B | ANTIGEN_RH,
+    'AB-': ANTIGEN_A | ANTIGEN_B,
+    'AB+': ANTIGEN_A | ANTIGEN_B | ANTIGEN_RH,
+}
+
+BLOOD_GROUPS = list(ANTIGENS)
+GROUP_INDEX = {group: i for i, group in enumerate(BLOOD_GROUPS)}
+
+
+def _can_donate(donor_group, recipient_group):
+    return ANTIGENS[donor_group] & ~ANTIGENS[recipient_group] == 0
+
+
+# recipient -> bitmask over BLOOD_GROUPS of groups it can receive from
+DONOR_MASK = {
+    recipient: sum(1 << GROUP_INDEX[donor] for donor in BLOOD_GROUPS if _can_donate(donor, recipient))
+    for recipient in BLOOD_GROUPS
+}
+
+# recipient -> compatible donor groups, the exact group first
+COMPATIBLE_DONORS = {
+    recipient: tuple([recipient] + [
+        donor for donor in BLOOD_GROUPS
+        if donor != recipient and DONOR_MASK[recipient] >> GROUP_INDEX[donor] & 1
+    ])
+    for recipient in BLOOD_GROUPS
+}
+
+
+def donor_groups_for(recipient_group, compatible=False):
+    """Donor blood groups to match for a recipient; unknown groups only match themselves"""
+    if compatible and recipient_group in COMPATIBLE_DONORS:
+        return COMPATIBLE_DONORS[recipient_group]
+    return (recipient_group,)
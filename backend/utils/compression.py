@@ -0,0 +1,47 @@
+"""
+gzip compression of responses.
+
+An after_request hook compresses a response when the client accepts
+gzip, its content type is in COMPRESS_MIMETYPES and its body is at least
+COMPRESS_MIN_SIZE bytes. Responses that already carry a Content-Encoding
+(e.g. precompressed catalog bodies) and streamed responses are left
+alone. A strong ETag becomes weak, since the bytes differ from the
+uncompressed representation; ETag checks in this app compare weakly.
+"""
+import gzip
+
+from flask import request
+
+
+def init_compression(app):
+    """Register the compression hook using the app's COMPRESS_* settings"""
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    level = app.config['COMPRESS_LEVEL']
+    mimetypes = frozenset(app.config['COMPRESS_MIMETYPES'])
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in mimetypes):
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if request.accept_encodings['gzip'] <= 0:
+            return response
+
+        compressed = gzip.compress(data, compresslevel=level)
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = 'gzip'
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
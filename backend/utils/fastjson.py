@@ -0,0 +1,72 @@
+"""
+Fast JSON responses for list endpoints.
+
+Uses orjson when it is installed, which encodes datetimes natively (same
+ISO 8601 form as datetime.isoformat()) and is several times faster than
+the stdlib encoder behind jsonify. Falls back to the stdlib json module.
+"""
+from datetime import date, datetime
+import gzip
+import hashlib
+import json
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Encode payload to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(payload, status=200):
+    """A jsonify() replacement that uses the fast encoder"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+
+def precompute(payload, compress=True):
+    """(body, strong ETag, gzipped body or None) for serving with precomputed_response"""
+    body = dumps(payload)
+    gzipped = gzip.compress(body, compresslevel=9, mtime=0) if compress else None
+    return body, hashlib.sha1(body).hexdigest(), gzipped
+
+
+def precomputed_response(body, etag, gzipped=None, cache_control='no-cache'):
+    """
+    Response for an already-serialized JSON body, answering 304 when the
+    client's If-None-Match matches the ETag. If a gzipped copy is given and
+    the client accepts gzip it is sent instead, with a weak ETag.
+    """
+    use_gzip = gzipped is not None and request.accept_encodings['gzip'] > 0
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif use_gzip:
+        response = Response(gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=use_gzip)
+    response.headers['Cache-Control'] = cache_control
+    if gzipped is not None:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def rows_to_dicts(rows):
+    """Turn projected result rows into dicts keyed by column label"""
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,145 @@
+"""
+Geospatial helpers: haversine distance and geohash cells.
+
+Donors carry a geohash of their coordinates in an indexed column. A radius
+search picks a geohash precision whose cells are about the size of the
+search box, enumerates the handful of cells that cover it, and turns each
+cell into a `geohash LIKE 'prefix%'` index range scan. Only the donors in
+those cells are then checked with the exact haversine distance.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+GEOHASH_PRECISION = 9
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Upper bound on cells used to cover one search box
+MAX_COVER_CELLS = 16
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION):
+    """Encode a point as a geohash string of the given length"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    ch = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits = 0
+            ch = 0
+
+    return ''.join(chars)
+
+
+def geohash_bounds(geohash):
+    """Return (south, west, north, east) of a geohash cell"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+
+    for c in geohash:
+        value = _BASE32.index(c)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def cell_size(precision):
+    """Return (lat_degrees, lon_degrees) spanned by a cell of the given precision"""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(lat, lon, radius_km):
+    """Return (south, west, north, east) of the box enclosing a circle"""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return (max(lat - d_lat, -90.0), max(lon - d_lon, -180.0),
+            min(lat + d_lat, 90.0), min(lon + d_lon, 180.0))
+
+
+def _cells_at(south, west, north, east, precision):
+    lat_step, lon_step = cell_size(precision)
+    cells = set()
+    lat = south
+    while True:
+        lon = west
+        while True:
+            cells.add(geohash_encode(min(lat, 90.0), min(lon, 180.0), precision))
+            if lon >= east:
+                break
+            lon = min(lon + lon_step, east)
+        if lat >= north:
+            break
+        lat = min(lat + lat_step, north)
+    return cells
+
+
+def covering_cells(south, west, north, east, max_cells=MAX_COVER_CELLS, max_precision=GEOHASH_PRECISION):
+    """
+    Return geohash prefixes that together cover the box.
+
+    Uses the finest precision (up to max_precision) whose cover stays within
+    max_cells, so the database touches as few rows outside the box as possible.
+    """
+    best = {''}
+    for precision in range(1, max_precision + 1):
+        lat_step, lon_step = cell_size(precision)
+        estimate = (math.ceil((north - south) / lat_step) + 1) * (math.ceil((east - west) / lon_step) + 1)
+        if estimate > max_cells * 4:
+            break
+        cells = _cells_at(south, west, north, east, precision)
+        if len(cells) > max_cells:
+            break
+        best = cells
+    return sorted(best)
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are ordered newest first on a (timestamp, id) pair, so every page is
+an index range scan that starts where the previous one stopped, no matter
+how deep the client has paged. The cursor handed to clients is opaque: a
+URL-safe base64 encoding of the last row's key.
+"""
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_
+
+from config import Config
+
+
+def encode_cursor(timestamp, row_id):
+    """Encode the (timestamp, id) key of the last row on a page"""
+    payload = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except (TypeError, ValueError, UnicodeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def get_page_args():
+    """
+    Read limit/cursor/include_count from the query string.
+
+    Returns None when neither limit nor cursor was supplied, so callers can
+    keep serving the unpaginated listing to existing clients.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None
+
+    try:
+        limit = int(limit) if limit is not None else Config.DEFAULT_PAGE_SIZE
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be positive')
+
+    return {
+        'limit': min(limit, Config.MAX_PAGE_SIZE),
+        'after': decode_cursor(cursor) if cursor else None,
+        'include_count': request.args.get('include_count', 'true').lower() == 'true',
+    }
+
+
+def keyset_page(query, timestamp_col, id_col, limit, after=None, include_count=True):
+    """
+    Fetch one page of `query` ordered by (timestamp_col, id_col) descending.
+
+    Returns (rows, next_cursor, count). next_cursor is None on the last page
+    and count is None when include_count is False, which spares the database
+    a full scan of the filtered set.
+    """
+    count = query.order_by(None).count() if include_count else None
+
+    if after is not None:
+        after_ts, after_id = after
+        query = query.filter(or_(
+            timestamp_col < after_ts,
+            and_(timestamp_col == after_ts, id_col < after_id)
+        ))
+
+    rows = query.order_by(timestamp_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, timestamp_col.key), getattr(last, id_col.key))
+
+    return rows, next_cursor, count
@@ -0,0 +1,18 @@
+"""
+Request parameter parsing shared by the routes.
+"""
+
+
+def parse_bool(value, default, name):
+    """
+    A boolean flag from a JSON body or query string: JSON true/false or the
+    strings 'true'/'false' (any case); None gives `default`. Anything else
+    raises ValueError with a message for the client.
+    """
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    raise ValueError(f'{name} must be true or false')
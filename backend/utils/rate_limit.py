@@ -0,0 +1,90 @@
+"""
+Thread-safe token bucket.
+
+Tokens refill continuously at `rate` per second up to `burst`. A caller
+that finds the bucket empty reserves the next token (the balance goes
+negative) and sleeps until it is due, so waiting callers are served in
+arrival order and share one budget across threads. Callers that would
+have to wait longer than their timeout are turned away without a token.
+"""
+from collections import deque
+import threading
+import time
+
+# Window for the recent throughput figure in stats()
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self.acquired = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now):
+        # _updated may lie in the future while the bucket is paused by throttle()
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to `timeout` seconds; returns False if none was taken"""
+        if self.rate <= 0:
+            return True
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(self._updated - now, 0) + max((1 - self._tokens) / self.rate, 0)
+            if timeout is not None and wait > timeout:
+                self.rejected += 1
+                return False
+
+            self._tokens -= 1
+            self.acquired += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+
+            self._recent.append(now + wait)
+            while self._recent and self._recent[0] < now - THROUGHPUT_WINDOW_SECONDS:
+                self._recent.popleft()
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def throttle(self, seconds):
+        """Back off after the provider pushed back: empty the bucket and pause refills"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0)
+            self._updated = max(self._updated, now + seconds)
+            self.throttled += 1
+
+    def stats(self):
+        """Budget, counters and recent throughput"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            recent = sum(1 for t in self._recent if now - THROUGHPUT_WINDOW_SECONDS <= t <= now)
+            return {
+                'rate_per_second': self.rate,
+                'burst': self.burst,
+                'tokens': round(max(self._tokens, 0), 2),
+                'acquired': self.acquired,
+                'delayed': self.delayed,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'avg_wait_ms': round(self.total_wait / self.delayed * 1000, 2) if self.delayed else 0,
+                'per_second_last_minute': round(recent / THROUGHPUT_WINDOW_SECONDS, 2),
+            }
@@ -0,0 +1,109 @@
+"""
+In-memory prefix search for autocomplete.
+
+Every entry is split into lowercase word tokens. Each token is inserted in
+a character trie whose nodes keep the set of entries having a token under
+that prefix, so a query token of any length resolves to its entries with
+one walk down the trie. A multi-word query intersects the sets of its
+tokens (so "apollo chen" finds Apollo hospitals in Chennai) and the
+survivors are ranked: more exact words first, then more of them in the
+name rather than the context, then names starting with the first query
+word, then shorter names.
+
+Aliases are groups of interchangeable words ("trichy", "tiruchirappalli").
+An entry containing any word of a group is indexed under all of them, so
+both spellings, and prefixes of either, find it.
+"""
+import heapq
+import re
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase word tokens of text"""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = set()
+
+
+class PrefixIndex:
+    def __init__(self, aliases=None):
+        """aliases: {alternative word: canonical word}"""
+        self._groups = {}
+        for alias, canonical in (aliases or {}).items():
+            alias, canonical = alias.lower(), canonical.lower()
+            group = self._groups.get(canonical, {canonical}) | self._groups.get(alias, {alias})
+            for word in group:
+                self._groups[word] = group
+        self._root = _Node()
+        self._items = []
+        self._names = []
+        self._terms = []
+        self._name_terms = []
+
+    def _expand(self, tokens):
+        terms = set()
+        for token in tokens:
+            terms |= self._groups.get(token, {token})
+        return terms
+
+    def add(self, name, item, context=()):
+        """Index item under the words of name and of the context strings"""
+        entry = len(self._items)
+        name_tokens = tokenize(name)
+        name_terms = self._expand(name_tokens)
+        terms = name_terms | self._expand([t for text in context for t in tokenize(text)])
+        self._items.append(item)
+        self._names.append((name_tokens[0] if name_tokens else '', len(name), name.lower()))
+        self._terms.append(terms)
+        self._name_terms.append(name_terms)
+
+        for term in terms:
+            node = self._root
+            for char in term:
+                node = node.children.setdefault(char, _Node())
+                node.entries.add(entry)
+
+    def _entries_with_prefix(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.entries
+
+    def search(self, query, limit=10, predicate=None):
+        """Best `limit` items matching every word of query as a word prefix"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        candidates = None
+        # Longer prefixes have smaller sets; start from those
+        for token in sorted(set(tokens), key=len, reverse=True):
+            entries = self._entries_with_prefix(token)
+            candidates = set(entries) if candidates is None else candidates & entries
+            if not candidates:
+                return []
+        if predicate is not None:
+            candidates = [entry for entry in candidates if predicate(self._items[entry])]
+
+        first = tokens[0]
+
+        def rank(entry):
+            first_word, length, name = self._names[entry]
+            exact = sum(1 for token in tokens if token in self._terms[entry])
+            in_name = sum(1 for token in tokens if token in self._name_terms[entry])
+            return (-exact, -in_name, not first_word.startswith(first), length, name)
+
+        return [self._items[entry] for entry in heapq.nsmallest(limit, candidates, key=rank)]
+
+    def __len__(self):
+        return len(self._items)
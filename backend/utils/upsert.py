@@ -0,0 +1,64 @@
+"""
+Single-statement upserts.
+
+MySQL gets INSERT ... ON DUPLICATE KEY UPDATE; SQLite and PostgreSQL get
+INSERT ... ON CONFLICT DO UPDATE. Either way the insert-or-update is one
+round trip and is decided atomically by the unique key, so concurrent
+writers cannot both insert.
+
+A list of rows is sent as one executemany of the same statement, which
+the drivers batch into multi-row inserts without SQLAlchemy compiling a
+statement with a VALUES clause per row.
+"""
+from sqlalchemy import func
+
+from models import db
+
+
+def upsert(model, values, conflict_columns, update_columns, keep_on_null=False,
+           set_first=None, returning=None):
+    """
+    Insert `values` (a dict or a list of dicts) into `model`'s table,
+    updating `update_columns` on rows whose `conflict_columns` unique key
+    already exists. With keep_on_null, a None in `values` leaves the
+    existing column value as it is (COALESCE(new, existing)).
+
+    `set_first` ({column: expression}) is assigned ahead of the update
+    columns, so its expressions still see the existing row. `returning`
+    columns are added as RETURNING (not available on MySQL). Returns the
+    execute() result.
+    """
+    dialect = db.session.get_bind().dialect.name
+    many = isinstance(values, list)
+
+    if dialect in ('mysql', 'mariadb'):
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    if many:
+        stmt = insert(model.__table__)
+    else:
+        stmt = insert(model).values(values)
+
+    new = stmt.inserted if dialect in ('mysql', 'mariadb') else stmt.excluded
+    table = model.__table__
+    set_ = dict(set_first or {})
+    set_.update({
+        c: func.coalesce(new[c], table.c[c]) if keep_on_null else new[c]
+        for c in update_columns
+    })
+
+    if dialect in ('mysql', 'mariadb'):
+        # A list of pairs keeps the SET order (MySQL evaluates it left to right)
+        stmt = stmt.on_duplicate_key_update(list(set_.items()))
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=conflict_columns, set_=set_)
+    if returning:
+        stmt = stmt.returning(*returning)
+
+    if many:
+        return db.session.execute(stmt, values)
+    return db.session.execute(stmt)
@@ -1,6 +1,6 @@
 
 import React, { useState, useEffect } from 'react';
-import { MapContainer, TileLayer, Marker, Popup } from 'react-leaflet';
+import { MapContainer, TileLayer, Marker, Popup, CircleMarker, Tooltip, useMap, useMapEvents } from 'react-leaflet';
 import L from 'leaflet';
 import { donorAPI, hospitalAPI } from '../api/Api';
 import 'leaflet/dist/leaflet.css';
@@ -13,22 +13,42 @@ L.Icon.Default.mergeOptions({
   shadowUrl: require('leaflet/dist/images/marker-shadow.png'),
 });
 
+// Reports the visible bounding box and zoom whenever the map stops moving
+const ViewportWatcher = ({ onChange }) => {
+  const map = useMap();
+
+  const report = () => {
+    const bounds = map.getBounds();
+    onChange({
+      bbox: [bounds.getSouth(), bounds.getWest(), bounds.getNorth(), bounds.getEast()].join(','),
+      zoom: map.getZoom(),
+    });
+  };
+
+  useMapEvents({ moveend: report });
+  useEffect(report, []);
+
+  return null;
+};
+
 const DonorMap = () => {
   const [donors, setDonors] = useState([]);
+  const [clusters, setClusters] = useState([]);
+  const [count, setCount] = useState(0);
   const [filters, setFilters] = useState({ blood_group: '', district: '' });
+  const [viewport, setViewport] = useState(null);
   const [districts, setDistricts] = useState([]);
-  const [loading, setLoading] = useState(true);
+  const [loading, setLoading] = useState(false);
 
   const center = [11.1271, 78.6569]; // Tamil Nadu center
 
   useEffect(() => {
     fetchDistricts();
-    fetchDonors();
   }, []);
 
   useEffect(() => {
-    fetchDonors();
-  }, [filters]);
+    if (viewport) fetchDonors();
+  }, [filters, viewport]);
 
   const fetchDistricts = async () => {
     try {
@@ -42,12 +62,19 @@ const DonorMap = () => {
   const fetchDonors = async () => {
     setLoading(true);
     try {
-      const params = {};
+      const params = { bbox: viewport.bbox, zoom: viewport.zoom };
       if (filters.blood_group) params.blood_group = filters.blood_group;
       if (filters.district) params.district = filters.district;
 
       const response = await donorAPI.getMap(params);
-      setDonors(response.data.donors.filter(d => d.latitude && d.longitude));
+      if (response.data.mode === 'clusters') {
+        setClusters(response.data.clusters);
+        setDonors([]);
+      } else {
+        setDonors(response.data.donors.filter(d => d.latitude && d.longitude));
+        setClusters([]);
+      }
+      setCount(response.data.count);
     } catch (error) {
       console.error('Error fetching donors:', error);
     } finally {
@@ -98,46 +125,56 @@ const DonorMap = () => {
       </div>
 
       {/* Map Section */}
-      {loading ? (
-        <div style={{ textAlign: 'center', padding: '40px' }}>Loading donors...</div>
-      ) : (
-        <>
-          <div className="card">
-            <p><strong>{donors.length}</strong> donor(s) found</p>
-          </div>
+      <div className="card">
+        <p>{loading ? 'Loading donors...' : <><strong>{count}</strong> donor(s) in view</>}</p>
+      </div>
 
-          <MapContainer center={center} zoom={7} style={{ height: '600px', width: '100%' }}>
-            <TileLayer
-              url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
-              attribution="&copy; OpenStreetMap contributors"
-            />
-
-            {donors.map(donor => (
-              <Marker key={donor.id} position={[donor.latitude, donor.longitude]}>
-                <Popup>
-                  <div>
-                    <h3>{donor.name}</h3>
-                    <p><strong>Blood Group:</strong> {donor.blood_group}</p>
-                    <p><strong>District:</strong> {donor.district}</p>
-                    <p><strong>Hospital:</strong> {donor.hospital}</p>
-                    <p><strong>Phone:</strong> {donor.phone}</p>
-                    <button
-                      onClick={() => handleCall(donor.phone)}
-                      className="btn btn-primary"
-                      style={{ marginTop: '5px', width: '100%' }}
-                    >
-                      Call Donor
-                    </button>
-                  </div>
-                </Popup>
-              </Marker>
-            ))}
-          </MapContainer>
-        </>
-      )}
+      <MapContainer center={center} zoom={7} style={{ height: '600px', width: '100%' }}>
+        <TileLayer
+          url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
+          attribution="&copy; OpenStreetMap contributors"
+        />
+        <ViewportWatcher onChange={setViewport} />
+
+        {clusters.map(cluster => (
+          <CircleMarker
+            key={cluster.cell}
+            center={[cluster.latitude, cluster.longitude]}
+            radius={Math.min(10 + Math.log2(cluster.count) * 4, 40)}
+            pathOptions={{ color: '#c62828', fillOpacity: 0.5 }}
+          >
+            <Tooltip>
+              <strong>{cluster.count}</strong> donor(s)
+              {Object.entries(cluster.blood_groups).map(([group, n]) => (
+                <div key={group}>{group}: {n}</div>
+              ))}
+            </Tooltip>
+          </CircleMarker>
+        ))}
+
+        {donors.map(donor => (
+          <Marker key={donor.id} position={[donor.latitude, donor.longitude]}>
+            <Popup>
+              <div>
+                <h3>{donor.name}</h3>
+                <p><strong>Blood Group:</strong> {donor.blood_group}</p>
+                <p><strong>District:</strong> {donor.district}</p>
+                <p><strong>Hospital:</strong> {donor.hospital}</p>
+                <p><strong>Phone:</strong> {donor.phone}</p>
+                <button
+                  onClick={() => handleCall(donor.phone)}
+                  className="btn btn-primary"
+                  style={{ marginTop: '5px', width: '100%' }}
+                >
+                  Call Donor
+                </button>
+              </div>
+            </Popup>
+          </Marker>
+        ))}
+      </MapContainer>
     </div>
   );
 };
 
 export default DonorMap;
-